@@ -1,25 +1,43 @@
 import io
 import logging
+import multiprocessing
 import os
+import posixpath
+import shutil
 import subprocess
 import tempfile
+import threading
+import uuid
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import List, Optional
+from types import SimpleNamespace
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
 import re
 import asyncio
+from http.cookiejar import CookieJar, DefaultCookiePolicy
 
 import httpx
-from fastapi import FastAPI, HTTPException, Response, Body
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Response, Body
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, HttpUrl
 from weasyprint import HTML, CSS
-from pptx import Presentation
+from weasyprint.text.fonts import FontConfiguration
+from lxml import etree
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from mutagen import MutagenError
+from mutagen.mp3 import MP3
 
 from graph_utils import (
-    download_file_from_graph,
+    KEEPALIVE_EXPIRY,
+    SOCKET_OPTIONS,
+    _gather_settled,
+    batch_download_from_graph,
+    stream_file_from_graph,
     upload_file_to_graph,
-    list_folder_children,
     get_item_name,
+    list_folder_children,
     startup_graph_client,
     close_graph_client,
 )
@@ -54,7 +72,9 @@ logging.basicConfig(
 # Defaults to 60 seconds if not provided.
 TIMEOUT = float(os.environ.get("REQUEST_TIMEOUT", "60"))
 CONNECT_TIMEOUT = float(os.environ.get("CONNECT_TIMEOUT", "10"))
-DOWNLOAD_CONCURRENCY = int(os.environ.get("DOWNLOAD_CONCURRENCY", "5"))
+# Downloads larger than this many bytes are spooled to disk instead of memory
+SPOOL_MAX_SIZE = int(os.environ.get("SPOOL_MAX_SIZE", str(8 * 1024 * 1024)))
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
 
 # httpx requires all timeout parameters be specified when using custom values.
 # Create a reusable configuration object shared by the client and per-request
@@ -62,29 +82,102 @@ DOWNLOAD_CONCURRENCY = int(os.environ.get("DOWNLOAD_CONCURRENCY", "5"))
 # Use a single timeout value for all operations to avoid misconfiguration
 HTTPX_TIMEOUT = httpx.Timeout(TIMEOUT)
 
-# Reusable HTTP client for outbound requests - created at startup
+# Reusable HTTP client for ``/extract`` downloads - created at startup. It is
+# kept apart from the Graph client so slow caller-supplied hosts cannot tie
+# up the connections authenticated SharePoint transfers need.
 http_client: httpx.AsyncClient | None = None
 
+# Every web worker runs its own PDF pool and ffmpeg limit, so by default each
+# gets an equal share of the CPUs rather than all of them
+WORKER_CPU_SHARE = max(
+    1, (os.cpu_count() or 1) // int(os.environ.get("WEB_CONCURRENCY", "4"))
+)
+
+# WeasyPrint holds the GIL for most of a render, so async PDF requests are
+# rendered in separate processes to run in parallel - created at startup.
+PDF_WORKERS = int(os.environ.get("PDF_WORKERS", str(WORKER_CPU_SHARE)))
+pdf_pool: ProcessPoolExecutor | None = None
+
+# Scratch root for ``/combine`` working directories - created on first use
+combine_tmp_root: Path | None = None
+
+# Limits ffmpeg encodes across all ``/combine`` requests - created on first use
+ffmpeg_semaphore: asyncio.Semaphore | None = None
+
+
+def _create_pdf_pool() -> ProcessPoolExecutor:
+    """Return a new process pool for PDF rendering."""
+    # ``spawn`` avoids forking a process that already runs an event loop
+    # and client threads.
+    return ProcessPoolExecutor(
+        max_workers=PDF_WORKERS, mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+def _ffmpeg_semaphore() -> asyncio.Semaphore:
+    """Return the semaphore bounding concurrent ffmpeg encodes."""
+    global ffmpeg_semaphore
+    if ffmpeg_semaphore is None:
+        ffmpeg_semaphore = asyncio.Semaphore(FFMPEG_CONCURRENCY)
+    return ffmpeg_semaphore
+
+
+def _combine_tmp_root() -> Path:
+    """Return the scratch root for ``/combine``, creating it if needed."""
+    global combine_tmp_root
+    if combine_tmp_root is None:
+        combine_tmp_root = Path(tempfile.mkdtemp(prefix="pptx_combine_"))
+    return combine_tmp_root
+
+
+def _create_http_client() -> httpx.AsyncClient:
+    """Return a new client for ``/extract`` downloads."""
+    limits = httpx.Limits(
+        max_connections=100,
+        max_keepalive_connections=50,
+        keepalive_expiry=KEEPALIVE_EXPIRY,
+    )
+    transport = httpx.AsyncHTTPTransport(
+        http2=True, limits=limits, retries=2, socket_options=SOCKET_OPTIONS
+    )
+    # Cookies set by one caller's host must not be sent on later requests
+    no_cookies = CookieJar(policy=DefaultCookiePolicy(allowed_domains=[]))
+    return httpx.AsyncClient(
+        timeout=HTTPX_TIMEOUT, transport=transport, cookies=no_cookies
+    )
+
 
 @app.on_event("startup")
 async def startup_event() -> None:
-    """Create shared HTTP clients."""
-    global http_client
-    limits = httpx.Limits(max_connections=100)
-    http_client = httpx.AsyncClient(timeout=HTTPX_TIMEOUT, limits=limits)
+    """Create shared HTTP clients, the PDF rendering pool and scratch root."""
+    global http_client, pdf_pool
+    http_client = _create_http_client()
+    pdf_pool = _create_pdf_pool()
+    _combine_tmp_root()
     await startup_graph_client()
 
 
 @app.on_event("shutdown")
 async def shutdown_event() -> None:
-    """Close shared HTTP clients."""
+    """Close shared HTTP clients and the PDF rendering pool."""
     if http_client is not None:
         await http_client.aclose()
+    if pdf_pool is not None:
+        pdf_pool.shutdown(wait=False)
+    if combine_tmp_root is not None:
+        shutil.rmtree(combine_tmp_root, ignore_errors=True)
     await close_graph_client()
 
 # External tool locations can be overridden via environment variables
 FFPROBE_BIN = os.environ.get("FFPROBE_BIN", "ffprobe")
+FFMPEG_BIN = os.environ.get("FFMPEG_BIN", "ffmpeg")
 LIBREOFFICE_BIN = os.environ.get("LIBREOFFICE_BIN", "libreoffice")
+PDFTOPPM_BIN = os.environ.get("PDFTOPPM_BIN", "pdftoppm")
+# Width in pixels of the rendered slide images (height keeps the aspect ratio)
+SLIDE_WIDTH = 1920
+# Number of slide segments encoded at the same time by each worker, shared
+# by all of its ``/combine`` requests
+FFMPEG_CONCURRENCY = int(os.environ.get("FFMPEG_CONCURRENCY", str(WORKER_CPU_SHARE)))
 
 
 class ExtractRequest(BaseModel):
@@ -123,44 +216,183 @@ class CombineResponse(BaseModel):
 class PdfGenerationError(Exception):
     """Raised when HTML to PDF conversion fails."""
 
-def _extract_slides(presentation: Presentation) -> List[SlideData]:
-    """Return slide metadata from a Presentation."""
-    slides = []
-    for idx, slide in enumerate(presentation.slides, start=1):
-        title = slide.shapes.title.text if slide.shapes.title else None
-        notes = (
-            slide.notes_slide.notes_text_frame.text
-            if slide.has_notes_slide and slide.notes_slide.notes_text_frame
-            else None
+_NS = {
+    "a": "http://schemas.openxmlformats.org/drawingml/2006/main",
+    "p": "http://schemas.openxmlformats.org/presentationml/2006/main",
+    "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+    "rel": "http://schemas.openxmlformats.org/package/2006/relationships",
+}
+_A_BR = f"{{{_NS['a']}}}br"
+_PRESENTATION_TAG = f"{{{_NS['p']}}}presentation"
+# Same hardening python-pptx applies to untrusted package XML
+_XML_PARSER = etree.XMLParser(resolve_entities=False)
+_RELATIONSHIPS_XP = etree.XPath("./rel:Relationship", namespaces=_NS)
+_SLIDE_RIDS_XP = etree.XPath("./p:sldIdLst/p:sldId/@r:id", namespaces=_NS)
+# Title placeholder: first shape whose placeholder idx is 0 (absent idx == 0),
+# matching python-pptx's ``slide.shapes.title``
+_TITLE_SHAPE_XP = etree.XPath(
+    "./p:cSld/p:spTree/*[*/p:nvPr/p:ph[not(@idx) or @idx='0']][1]",
+    namespaces=_NS,
+)
+# Notes text lives in the body placeholder of the notes slide
+_NOTES_SHAPE_XP = etree.XPath(
+    "./p:cSld/p:spTree/*[*/p:nvPr/p:ph[@type='body']][1]",
+    namespaces=_NS,
+)
+_PARAGRAPHS_XP = etree.XPath("./p:txBody/a:p", namespaces=_NS)
+_PARAGRAPH_TEXT_XP = etree.XPath(
+    "./a:r/a:t | ./a:br | ./a:fld/a:t", namespaces=_NS
+)
+
+
+def _read_xml(archive: zipfile.ZipFile, partname: str) -> etree._Element:
+    """Return the parsed XML root of a package part."""
+    return etree.fromstring(archive.read(partname), _XML_PARSER)
+
+
+def _part_rels(
+    archive: zipfile.ZipFile, partname: str
+) -> Dict[str, Tuple[str, str]]:
+    """Return ``{rId: (reltype, target partname)}`` for a package part.
+
+    ``partname`` of ``""`` addresses the package-level relationships.
+    """
+    base, name = posixpath.split(partname)
+    try:
+        root = _read_xml(archive, posixpath.join(base, "_rels", f"{name}.rels"))
+    except KeyError:
+        return {}
+    rels = {}
+    for rel in _RELATIONSHIPS_XP(root):
+        if rel.get("TargetMode") == "External":
+            continue
+        target = posixpath.normpath(posixpath.join(base, rel.get("Target")))
+        rels[rel.get("Id")] = (rel.get("Type"), target.lstrip("/"))
+    return rels
+
+
+def _related_part(
+    archive: zipfile.ZipFile, partname: str, reltype: str
+) -> Optional[str]:
+    """Return the first part related to ``partname`` by ``reltype``."""
+    for rel_type, target in _part_rels(archive, partname).values():
+        if rel_type == reltype:
+            return target
+    return None
+
+
+def _iter_slide_xml(
+    archive: zipfile.ZipFile,
+) -> Iterator[Tuple[etree._Element, Optional[etree._Element]]]:
+    """Yield ``(slide, notes_slide)`` XML roots in presentation order.
+
+    Only the presentation, slide and notes-slide parts are decompressed;
+    python-pptx would read every member of the package, media included.
+    """
+    prs_name = _related_part(archive, "", RT.OFFICE_DOCUMENT)
+    if prs_name is None:
+        raise ValueError("package has no main document part")
+    presentation = _read_xml(archive, prs_name)
+    if presentation.tag != _PRESENTATION_TAG:
+        raise ValueError(f"not a PowerPoint file: {presentation.tag}")
+
+    prs_rels = _part_rels(archive, prs_name)
+    for rid in _SLIDE_RIDS_XP(presentation):
+        _, slide_name = prs_rels[rid]
+        notes_name = _related_part(archive, slide_name, RT.NOTES_SLIDE)
+        yield (
+            _read_xml(archive, slide_name),
+            _read_xml(archive, notes_name) if notes_name else None,
+        )
+
+
+def _shape_text(shape) -> str:
+    """Return the text of a shape element the way python-pptx renders it."""
+    return "\n".join(
+        "".join(
+            "\v" if node.tag == _A_BR else (node.text or "")
+            for node in _PARAGRAPH_TEXT_XP(paragraph)
         )
-        slides.append(SlideData(slide_number=idx, title_text=title, notes_text=notes))
+        for paragraph in _PARAGRAPHS_XP(shape)
+    )
+
+
+def _extract_slides(archive: zipfile.ZipFile) -> List[Dict[str, Any]]:
+    """Return slide metadata from an opened ``.pptx`` archive.
+
+    Titles and notes are read with precompiled XPath queries on the slide
+    XML, mirroring python-pptx's ``shapes.title`` and ``notes_text_frame``.
+    Plain dicts are returned; they are validated against ``SlideData`` once,
+    as part of the ``ExtractResponse`` response model, rather than building a
+    model instance per slide.
+    """
+    slides = []
+    for idx, (slide, notes_slide) in enumerate(_iter_slide_xml(archive), start=1):
+        title_shapes = _TITLE_SHAPE_XP(slide)
+        title = _shape_text(title_shapes[0]) if title_shapes else None
+
+        notes = None
+        if notes_slide is not None:
+            notes_shapes = _NOTES_SHAPE_XP(notes_slide)
+            notes = _shape_text(notes_shapes[0]) if notes_shapes else None
+
+        slides.append({"slide_number": idx, "title_text": title, "notes_text": notes})
     return slides
 
 
+def _extract_pptx(fileobj: BinaryIO) -> List[Dict[str, Any]]:
+    """Open ``fileobj`` as a ``.pptx`` package and return its slide metadata."""
+    with zipfile.ZipFile(fileobj) as archive:
+        return _extract_slides(archive)
+
+
+_SLIDE_NUM_RE = re.compile(r"(\d+)")
+
+
 def _parse_slide_number(path: Path) -> int:
     """Return the numeric slide number embedded in a filename."""
-    match = re.search(r"(\d+)", path.stem)
+    match = _SLIDE_NUM_RE.search(path.stem)
     if match:
         return int(match.group(1))
     logger.warning("Unexpected slide filename: %s", path.name)
     return 0
 
 
+def _audio_slide_number(name: str) -> int:
+    """Return ``n`` from an audio filename of the form ``slide_<n>.mp3``."""
+    return int(name.rpartition("_")[2].partition(".")[0])
+
+
+# Explicitly set the page size in landscape orientation to avoid clipping
+# wide content. Some versions of WeasyPrint have trouble parsing
+# ``A4 landscape`` so we specify the width and height directly. The
+# stylesheet is parsed once and shared by every conversion.
+PAGE_CSS = CSS(string="@page { size: 29.7cm 21cm; margin: 1cm }")
+
+# Font discovery is expensive, so each thread keeps one FontConfiguration for
+# all of its conversions (Pango font maps must not be shared across threads).
+_fonts = threading.local()
+
+
+def _font_config() -> FontConfiguration:
+    """Return the WeasyPrint font configuration for the current thread."""
+    config = getattr(_fonts, "config", None)
+    if config is None:
+        config = _fonts.config = FontConfiguration()
+    return config
+
+
 def _html_to_pdf_bytes(html_bytes: bytes) -> bytes:
     """Return PDF data generated from raw HTML bytes."""
     logger.debug("Converting %d HTML bytes to PDF", len(html_bytes))
     buf = io.BytesIO()
     try:
         html = html_bytes.decode()
-        # Explicitly set the page size in landscape orientation to avoid
-        # clipping wide content. Some versions of WeasyPrint have trouble
-        # parsing ``A4 landscape`` so we specify the width and height
-        # directly.
-        css = CSS(string="@page { size: 29.7cm 21cm; margin: 1cm }")
         HTML(string=html).write_pdf(
             target=buf,
-            stylesheets=[css],
+            stylesheets=[PAGE_CSS],
             presentational_hints=True,
+            font_config=_font_config(),
         )
     except UnicodeDecodeError as exc:
         logger.error("Invalid HTML encoding: %s", exc)
@@ -171,7 +403,7 @@ def _html_to_pdf_bytes(html_bytes: bytes) -> bytes:
     return buf.getvalue()
 
 
-def get_audio_duration(path: Path) -> float:
+async def _ffprobe_duration(path: Path) -> float:
     """Return audio duration in seconds using ffprobe."""
     cmd = [
         FFPROBE_BIN,
@@ -184,7 +416,7 @@ def get_audio_duration(path: Path) -> float:
         str(path),
     ]
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        result = await run_cmd(cmd)
     except FileNotFoundError as exc:
         logger.exception("ffprobe not found")
         raise HTTPException(status_code=500, detail="ffprobe is not installed") from exc
@@ -197,79 +429,209 @@ def get_audio_duration(path: Path) -> float:
     return float(result.stdout.strip())
 
 
+def _mp3_duration(path: Path) -> Optional[float]:
+    """Return the duration from the MP3 header, or ``None`` if unreadable."""
+    try:
+        return MP3(str(path)).info.length
+    except MutagenError:
+        logger.warning("Could not read MP3 header of %s; using ffprobe", path.name)
+        return None
+
+
 async def calculate_slide_durations(audio_paths: List[Path]) -> List[float]:
-    """Return per-slide durations including crossfade padding."""
-    tasks = [asyncio.to_thread(get_audio_duration, p) for p in audio_paths]
-    mp3_durations = await asyncio.gather(*tasks)
-    return [duration + 2.0 for duration in mp3_durations]
+    """Return per-slide durations: the audio length plus a 2 s pause.
+
+    All MP3 headers are read in-process with mutagen in one worker thread,
+    which avoids forking a process per file; ffprobe is only started for the
+    files mutagen rejects.
+    """
+    durations = await asyncio.to_thread(
+        lambda: [_mp3_duration(path) for path in audio_paths]
+    )
+    missing = [idx for idx, duration in enumerate(durations) if duration is None]
+    if missing:
+        probed = await asyncio.gather(
+            *(_ffprobe_duration(audio_paths[idx]) for idx in missing)
+        )
+        for idx, duration in zip(missing, probed):
+            durations[idx] = duration
+    return [duration + 2.0 for duration in durations]
+
 
+async def run_cmd(cmd: List[str]) -> SimpleNamespace:
+    """Run an external command asynchronously and raise on failure.
 
-async def run_cmd(cmd: List[str]) -> None:
-    """Run an external command asynchronously and raise on failure."""
+    Returns a namespace whose ``stdout`` attribute holds the decoded output.
+    If the caller is cancelled the child process is killed and reaped.
+    """
     proc = await asyncio.create_subprocess_exec(
         *cmd,
         stdout=asyncio.subprocess.PIPE,
         stderr=asyncio.subprocess.PIPE,
     )
-    stdout, stderr = await proc.communicate()
+    try:
+        stdout, stderr = await proc.communicate()
+    except asyncio.CancelledError:
+        proc.kill()
+        await proc.wait()
+        raise
     if proc.returncode != 0:
         raise subprocess.CalledProcessError(
             proc.returncode, cmd, output=stdout, stderr=stderr
         )
+    return SimpleNamespace(stdout=stdout.decode(errors="replace"))
 
 
-@app.post("/extract", response_model=ExtractResponse)
-async def extract_notes(request: ExtractRequest):
-    url = str(request.file_url)
-    logger.info("Extraction requested for %s", url)
-
+async def _run_converter(cmd: List[str], name: str) -> None:
+    """Run a slide conversion tool, mapping failures to HTTP errors."""
     try:
-        response = await http_client.get(
-            url, timeout=HTTPX_TIMEOUT, follow_redirects=True
+        await run_cmd(cmd)
+    except FileNotFoundError as exc:
+        logger.exception("%s not found", name)
+        raise HTTPException(
+            status_code=500,
+            detail=f"{name} is not installed",
+        ) from exc
+    except subprocess.CalledProcessError as exc:
+        logger.exception(
+            "Slide image conversion failed: %s",
+            exc.stderr.decode(errors="replace") if exc.stderr else ""
         )
-        response.raise_for_status()
-        logger.debug("Downloaded %d bytes", len(response.content))
-    except (httpx.RequestError, httpx.HTTPStatusError) as exc:
-        logger.exception("Failed to download file from %s", url)
         raise HTTPException(
-            status_code=400, detail=f"Unable to download file: {exc}"
+            status_code=500,
+            detail="PPTX conversion failed",
         ) from exc
 
-    content_type = response.headers.get("Content-Type", "")
-    logger.debug("Content-Type received: %s", content_type)
-    if (
-        content_type
-        and "presentation" not in content_type
-        and "ppt" not in content_type
-    ):
-        logger.warning("Unsupported content type: %s", content_type)
-        raise HTTPException(status_code=422, detail="Only .pptx files are supported")
-
-    pptx_bytes = io.BytesIO(response.content)
-    try:
-        presentation = Presentation(pptx_bytes)
-    except Exception as exc:  # pylint: disable=broad-except
-        logger.exception("Failed to parse PowerPoint file")
-        raise HTTPException(status_code=422, detail="Invalid .pptx file") from exc
 
-    slides_data = _extract_slides(presentation)
+async def render_slide_images(pptx_path: Path, slides_dir: Path) -> List[Path]:
+    """Render every slide of ``pptx_path`` to a PNG in ``slides_dir``.
+
+    LibreOffice's ``--convert-to png`` only exports the first slide, so the
+    deck is converted to PDF once and all pages are rasterised in a single
+    ``pdftoppm`` run. Images are returned in slide order.
+    """
+    await _run_converter(
+        [
+            LIBREOFFICE_BIN,
+            "--headless",
+            "--convert-to",
+            "pdf",
+            str(pptx_path),
+            "--outdir",
+            str(pptx_path.parent),
+        ],
+        "libreoffice",
+    )
+    await _run_converter(
+        [
+            PDFTOPPM_BIN,
+            "-png",
+            "-scale-to-x",
+            str(SLIDE_WIDTH),
+            "-scale-to-y",
+            "-1",
+            str(pptx_path.with_suffix(".pdf")),
+            str(slides_dir / "slide"),
+        ],
+        "pdftoppm",
+    )
+    return sorted(slides_dir.glob("*.png"), key=_parse_slide_number)
+
+
+@app.post("/extract", response_model=ExtractResponse)
+async def extract_notes(request: ExtractRequest):
+    url = str(request.file_url)
+    logger.info("Extraction requested for %s", url)
+
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as spool:
+        try:
+            async with http_client.stream(
+                "GET", url, timeout=HTTPX_TIMEOUT, follow_redirects=True
+            ) as response:
+                response.raise_for_status()
+
+                content_type = response.headers.get("Content-Type", "")
+                logger.debug("Content-Type received: %s", content_type)
+                if (
+                    content_type
+                    and "presentation" not in content_type
+                    and "ppt" not in content_type
+                ):
+                    logger.warning("Unsupported content type: %s", content_type)
+                    raise HTTPException(
+                        status_code=422, detail="Only .pptx files are supported"
+                    )
+
+                # Spool the body as it arrives so large decks are not held in
+                # memory twice (response buffer plus BytesIO copy). When the
+                # declared size already exceeds the spool limit, go straight
+                # to disk instead of buffering and then copying the prefix.
+                try:
+                    size = int(response.headers.get("Content-Length", 0))
+                except ValueError:
+                    size = 0
+                if size > SPOOL_MAX_SIZE:
+                    spool.rollover()
+                async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                    spool.write(chunk)
+            logger.debug("Downloaded %d bytes", spool.tell())
+        except (httpx.RequestError, httpx.HTTPStatusError) as exc:
+            logger.exception("Failed to download file from %s", url)
+            raise HTTPException(
+                status_code=400, detail=f"Unable to download file: {exc}"
+            ) from exc
+
+        spool.seek(0)
+        try:
+            # Parsing is CPU-bound; keep it off the event loop
+            slides_data = await asyncio.to_thread(_extract_pptx, spool)
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.exception("Failed to parse PowerPoint file")
+            raise HTTPException(status_code=422, detail="Invalid .pptx file") from exc
 
     logger.info("Successfully extracted %d slides", len(slides_data))
 
-    filename = request.file_name
-    return ExtractResponse(
-        filename=filename,
-        slide_count=len(slides_data),
-        slides=slides_data,
-    )
+    # FastAPI validates this against ``ExtractResponse`` exactly once; returning
+    # a model instance would be dumped and re-validated.
+    return {
+        "filename": request.file_name,
+        "slide_count": len(slides_data),
+        "slides": slides_data,
+    }
+
+
+async def _render_pdf_in_pool(html_bytes: bytes) -> bytes:
+    """Render ``html_bytes`` in ``pdf_pool``, replacing the pool if it broke.
+
+    A worker that crashes or is killed (e.g. by the OOM killer) leaves the
+    whole ``ProcessPoolExecutor`` unusable, so the pool is recreated and the
+    render retried once.
+    """
+    global pdf_pool
+    loop = asyncio.get_running_loop()
+    pool = pdf_pool
+    try:
+        return await loop.run_in_executor(pool, _html_to_pdf_bytes, html_bytes)
+    except BrokenProcessPool:
+        # Concurrent requests may all see the same broken pool; only the
+        # first one replaces it.
+        if pdf_pool is pool:
+            logger.warning("PDF rendering pool is broken; starting a new one")
+            pool.shutdown(wait=False)
+            pdf_pool = _create_pdf_pool()
+        return await loop.run_in_executor(pdf_pool, _html_to_pdf_bytes, html_bytes)
 
 
 @app.post("/html-to-pdf/async")
 async def html_to_pdf_async(html_bytes: bytes = Body(...)) -> Response:
-    """Generate a PDF from provided raw HTML asynchronously."""
+    """Generate a PDF from provided raw HTML asynchronously.
+
+    Rendering runs in ``pdf_pool`` (the default thread pool if the startup
+    hook has not created it).
+    """
     logger.debug("/html-to-pdf/async request with %d bytes", len(html_bytes))
     try:
-        pdf_bytes = await asyncio.to_thread(_html_to_pdf_bytes, html_bytes)
+        pdf_bytes = await _render_pdf_in_pool(html_bytes)
     except PdfGenerationError as exc:
         logger.error("PDF generation failed: %s", exc)
         raise HTTPException(status_code=500, detail="PDF generation failed") from exc
@@ -294,8 +656,70 @@ def html_to_pdf(html_bytes: bytes = Body(...)) -> Response:
     return Response(content=pdf_bytes, media_type="application/pdf")
 
 
+def _segment_cmd(image: Path, audio: Path, duration: float, output: Path) -> List[str]:
+    """Return the ffmpeg command encoding one slide image with its audio.
+
+    The audio is padded with silence so the slide stays on screen for the
+    full ``duration``. Codec settings are fixed so the segments can be
+    concatenated with stream copy.
+    """
+    return [
+        FFMPEG_BIN,
+        "-y",
+        "-loop",
+        "1",
+        "-framerate",
+        "30",
+        "-i",
+        str(image),
+        "-i",
+        str(audio),
+        "-af",
+        "apad",
+        "-t",
+        f"{duration:.3f}",
+        "-vf",
+        "scale=trunc(iw/2)*2:trunc(ih/2)*2",
+        "-c:v",
+        "libx264",
+        "-tune",
+        "stillimage",
+        "-pix_fmt",
+        "yuv420p",
+        "-c:a",
+        "aac",
+        "-ar",
+        "44100",
+        "-ac",
+        "2",
+        str(output),
+    ]
+
+
+async def _run_ffmpeg(cmd: List[str]) -> None:
+    """Run ffmpeg, mapping failures to HTTP errors."""
+    try:
+        await run_cmd(cmd)
+    except FileNotFoundError as exc:
+        logger.exception("ffmpeg not found")
+        raise HTTPException(
+            status_code=500,
+            detail="ffmpeg is not installed",
+        ) from exc
+    except subprocess.CalledProcessError as exc:
+        logger.exception(
+            "ffmpeg failed: %s",
+            exc.stderr.decode(errors="replace") if exc.stderr else ""
+        )
+        raise HTTPException(
+            status_code=500, detail="Video generation failed"
+        ) from exc
+
+
 @app.post("/combine", response_model=CombineResponse)
-async def combine_presentation(request: CombineRequest):
+async def combine_presentation(
+    request: CombineRequest, background_tasks: BackgroundTasks
+):
     """Combine a PPTX presentation with per-slide audio into a video."""
     logger.info(
         "Combining PPTX %s in drive %s with audio from folder %s",
@@ -308,32 +732,52 @@ async def combine_presentation(request: CombineRequest):
     folder_id = request.folder_id
     pptx_id = request.pptx_file_id
 
+    # Each request works in its own subdirectory of a per-process scratch
+    # root instead of creating a fresh temporary directory.
+    tmp_path = _combine_tmp_root() / uuid.uuid4().hex
+    tmp_path.mkdir()
     try:
-        pptx_bytes = await download_file_from_graph(drive_id, pptx_id)
-        pptx_name = await get_item_name(drive_id, pptx_id)
-    except Exception as exc:  # pylint: disable=broad-except
-        status = getattr(getattr(exc, "response", None), "status_code", None)
-        if status is not None:
-            logger.error("Failed to download PPTX from Graph: HTTP %s", status)
-        logger.exception("Failed to download PPTX from Graph")
-        raise HTTPException(
-            status_code=400,
-            detail=f"Unable to download PPTX: {exc}",
-        ) from exc
-
-    with tempfile.TemporaryDirectory() as tmpdir:
-        tmp_path = Path(tmpdir)
         pptx_path = tmp_path / "presentation.pptx"
-        pptx_path.write_bytes(pptx_bytes)
 
-        # Retrieve MP3 metadata from the folder
-        try:
-            children = await list_folder_children(drive_id, folder_id)
-        except Exception as exc:  # pylint: disable=broad-except
-            logger.exception("Failed to list folder contents")
+        # Stream the deck straight to disk while the audio folder is listed.
+        # The deck's name comes from the download's Content-Disposition
+        # header, so no separate metadata request is needed.
+        # ``return_exceptions`` lets both calls settle before the temporary
+        # directory can be torn down and tells us which one failed.
+        download_result, children_result = await asyncio.gather(
+            stream_file_from_graph(drive_id, pptx_id, pptx_path),
+            list_folder_children(drive_id, folder_id),
+            return_exceptions=True,
+        )
+        if isinstance(download_result, BaseException):
+            response = getattr(download_result, "response", None)
+            status = getattr(response, "status_code", None)
+            if status is not None:
+                logger.error("Failed to download PPTX from Graph: HTTP %s", status)
+            logger.error(
+                "Failed to download PPTX from Graph", exc_info=download_result
+            )
+            raise HTTPException(
+                status_code=400,
+                detail="Unable to download PPTX",
+            ) from download_result
+        if isinstance(children_result, BaseException):
+            logger.error("Failed to list folder contents", exc_info=children_result)
             raise HTTPException(
                 status_code=400, detail="Unable to list folder"
-            ) from exc
+            ) from children_result
+        children = children_result
+
+        pptx_name = download_result
+        if not pptx_name:
+            # Header missing (unusual); fall back to an item metadata lookup
+            try:
+                pptx_name = await get_item_name(drive_id, pptx_id)
+            except Exception as exc:  # pylint: disable=broad-except
+                logger.error("Failed to fetch PPTX name", exc_info=exc)
+                raise HTTPException(
+                    status_code=400, detail="Unable to download PPTX"
+                ) from exc
 
         audio_items = [
             item for item in children if item.get("name", "").lower().endswith(".mp3")
@@ -342,60 +786,24 @@ async def combine_presentation(request: CombineRequest):
             raise HTTPException(status_code=400, detail="No MP3 files found")
 
         # Sort by slide number based on filename pattern slide_<n>.mp3
-        audio_items.sort(key=lambda x: int(Path(x["name"]).stem.split("_")[-1]))
-
-        audio_paths: List[Path] = []
-
-        semaphore = asyncio.Semaphore(DOWNLOAD_CONCURRENCY)
-
-        async def fetch_audio(item: dict) -> Path:
-            async with semaphore:
-                audio_bytes = await asyncio.wait_for(
-                    download_file_from_graph(drive_id, item["id"]), timeout=TIMEOUT
-                )
-                audio_path = tmp_path / item["name"]
-                audio_path.write_bytes(audio_bytes)
-                await asyncio.to_thread(get_audio_duration, audio_path)
-                return audio_path
+        audio_items.sort(key=lambda x: _audio_slide_number(x["name"]))
+
+        # Download URLs for up to ``BATCH_LIMIT`` files are resolved per
+        # Graph round trip; the files themselves are streamed to disk
+        # concurrently.
+        audio_paths = [tmp_path / item["name"] for item in audio_items]
+        await batch_download_from_graph(
+            drive_id,
+            {item["id"]: path for item, path in zip(audio_items, audio_paths)},
+            retries=5,
+        )
 
-        results = await asyncio.gather(*(fetch_audio(it) for it in audio_items))
-        for path in results:
-            audio_paths.append(path)
+        # Probe every file in one pass once the downloads have settled
+        slide_durations = await calculate_slide_durations(audio_paths)
 
         slides_dir = tmp_path / "slides"
         slides_dir.mkdir(exist_ok=True)
-        try:
-            await run_cmd(
-                [
-                    LIBREOFFICE_BIN,
-                    "--headless",
-                    "--convert-to",
-                    "png",
-                    str(pptx_path),
-                    "--outdir",
-                    str(slides_dir),
-                ]
-            )
-        except FileNotFoundError as exc:
-            logger.exception("libreoffice not found")
-            raise HTTPException(
-                status_code=500,
-                detail="libreoffice is not installed",
-            ) from exc
-        except subprocess.CalledProcessError as exc:
-            logger.exception(
-                "Slide image conversion failed: %s",
-                exc.stderr.decode(errors="replace") if exc.stderr else ""
-            )
-            raise HTTPException(
-                status_code=500,
-                detail="PPTX conversion failed",
-            ) from exc
-
-        image_files = sorted(
-            slides_dir.glob("*.png"),
-            key=_parse_slide_number,
-        )
+        image_files = await render_slide_images(pptx_path, slides_dir)
 
         if len(image_files) != len(audio_paths):
             logger.warning(
@@ -405,36 +813,64 @@ async def combine_presentation(request: CombineRequest):
             )
             raise HTTPException(status_code=400, detail="Slide count mismatch")
 
-        output_path = tmp_path / f"{Path(pptx_name).stem}.mp4"
-        cmd = [
-            "ffmpeg",
-            "-y",
-            str(output_path),
+        # Slides are independent, so each one is encoded to its own segment
+        # in parallel and the segments are then joined without re-encoding.
+        # They get their own directory so no deck name can make the output
+        # overwrite one of the concat inputs.
+        segments_dir = tmp_path / "segments"
+        segments_dir.mkdir()
+        segments = [
+            segments_dir / f"segment_{idx}.mp4" for idx in range(len(image_files))
         ]
+        semaphore = _ffmpeg_semaphore()
 
-        try:
-            await run_cmd(cmd)
-        except FileNotFoundError as exc:
-            logger.exception("ffmpeg not found")
-            raise HTTPException(
-                status_code=500,
-                detail="ffmpeg is not installed",
-            ) from exc
-        except subprocess.CalledProcessError as exc:
-            logger.exception("ffmpeg failed")
-            raise HTTPException(
-                status_code=500, detail="Video generation failed"
-            ) from exc
+        async def encode(image: Path, audio: Path, duration: float, segment: Path):
+            async with semaphore:
+                await _run_ffmpeg(_segment_cmd(image, audio, duration, segment))
 
-        try:
-            video_bytes = output_path.read_bytes()
-            upload_url = await upload_file_to_graph(
-                drive_id, folder_id, output_path.name, video_bytes
+        await _gather_settled(
+            *(
+                encode(*slide)
+                for slide in zip(image_files, audio_paths, slide_durations, segments)
             )
+        )
+
+        concat_list = segments_dir / "segments.txt"
+        concat_list.write_text("".join(f"file '{seg.name}'\n" for seg in segments))
+        output_path = tmp_path / f"{Path(pptx_name).stem}.mp4"
+        await _run_ffmpeg(
+            [
+                FFMPEG_BIN,
+                "-y",
+                "-f",
+                "concat",
+                "-safe",
+                "0",
+                "-i",
+                str(concat_list),
+                "-c",
+                "copy",
+                str(output_path),
+            ]
+        )
+
+        try:
+            with output_path.open("rb") as video_file:
+                upload_url = await upload_file_to_graph(
+                    drive_id, folder_id, output_path.name, video_file
+                )
         except Exception as exc:  # pylint: disable=broad-except
             logger.exception("Upload of generated video failed")
             raise HTTPException(status_code=500, detail="Upload failed") from exc
-
+    except BaseException:
+        # Background tasks only run after a successful response; cancelled
+        # requests must clean up as well
+        await asyncio.to_thread(shutil.rmtree, tmp_path, ignore_errors=True)
+        raise
+
+    # Remove the intermediates after the response has been sent so the
+    # client does not wait for the deletion.
+    background_tasks.add_task(shutil.rmtree, tmp_path, ignore_errors=True)
     return CombineResponse(
         status="success",
         video_filename=output_path.name,
@@ -446,4 +882,15 @@ async def combine_presentation(request: CombineRequest):
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # uvloop and httptools (from uvicorn[standard]) replace the default
+    # asyncio loop and h11 parser; multiple workers need the import string.
+    uvicorn.run(
+        "extractor_api:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        workers=int(
+            os.environ.get("WEB_CONCURRENCY", max(1, (os.cpu_count() or 1) // 2))
+        ),
+    )
@@ -2,16 +2,75 @@
 
 from __future__ import annotations
 
+import functools
+import inspect
 import os
+import random
+import re
+import socket
 import time
-from typing import Iterable, Dict, Optional
+from collections import OrderedDict
+from email.message import Message
+from email.utils import collapse_rfc2231_value
+from pathlib import Path
+from typing import (
+    Any,
+    Awaitable,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 import asyncio
 
 import httpx
+import orjson
 
 GRAPH_BASE_URL = os.environ.get("GRAPH_BASE_URL", "https://graph.microsoft.com/v1.0")
-REQUEST_TIMEOUT = float(os.environ.get("REQUEST_TIMEOUT", "60"))
 CONNECT_TIMEOUT = float(os.environ.get("CONNECT_TIMEOUT", "10"))
+# Metadata calls return small JSON bodies and should fail fast; file
+# transfers get a longer read/write allowance
+METADATA_TIMEOUT = httpx.Timeout(
+    float(os.environ.get("METADATA_TIMEOUT", "10")), connect=CONNECT_TIMEOUT
+)
+TRANSFER_TIMEOUT = httpx.Timeout(
+    float(os.environ.get("TRANSFER_TIMEOUT", "300")), connect=CONNECT_TIMEOUT
+)
+# Size of the chunks written to disk while streaming file downloads
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# Files above this size are uploaded through an upload session; Graph only
+# accepts single-request uploads of small files
+SMALL_UPLOAD_LIMIT = 4 * 1024 * 1024
+# Upload session fragments must be a multiple of 320 KiB
+UPLOAD_SESSION_CHUNK_SIZE = 32 * 320 * 1024
+# Maximum number of sub-requests Graph accepts in a single $batch call
+BATCH_LIMIT = 20
+DOWNLOAD_CONCURRENCY = int(os.environ.get("DOWNLOAD_CONCURRENCY", "5"))
+# Connection pool bounds; by default sized from the download fan-out
+GRAPH_MAX_CONNECTIONS = int(
+    os.environ.get("GRAPH_MAX_CONNECTIONS", str(DOWNLOAD_CONCURRENCY * 2))
+)
+GRAPH_MAX_KEEPALIVE = int(
+    os.environ.get("GRAPH_MAX_KEEPALIVE", str(DOWNLOAD_CONCURRENCY))
+)
+# Graph signals throttling with these statuses; they are retried with backoff
+THROTTLE_STATUS_CODES = (429, 503)
+MAX_BACKOFF = 30
+# Seconds that item names and folder listings are served from memory
+ITEM_NAME_CACHE_TTL = 60
+FOLDER_LISTING_CACHE_TTL = 15
+# Graph traffic is many small requests: disable Nagle's algorithm so they are
+# not delayed waiting for ACKs, and keep idle sockets (and their TLS sessions)
+# alive for the whole length of a ``/combine`` call.
+SOCKET_OPTIONS = [
+    (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),
+    (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+]
+KEEPALIVE_EXPIRY = 60.0
 
 # Shared HTTP client for Graph requests
 graph_client: Optional[httpx.AsyncClient] = None
@@ -20,20 +79,30 @@ graph_client: Optional[httpx.AsyncClient] = None
 async def startup_graph_client() -> None:
     """Create the HTTP client used for Graph requests.
 
-    The default connection pool limit of ``httpx.AsyncClient`` is ``100``. When
-    downloading many audio files concurrently this limit can be exceeded which
-    results in ``PoolTimeout`` errors. To avoid this we create the client with
-    an unlimited connection pool.
+    The client speaks HTTP/2 so the concurrent audio downloads and metadata
+    calls issued by ``/combine`` are multiplexed over a single TCP/TLS
+    connection to Graph instead of each opening its own socket. The pool is
+    bounded by ``GRAPH_MAX_CONNECTIONS``/``GRAPH_MAX_KEEPALIVE`` (sized from
+    ``DOWNLOAD_CONCURRENCY`` by default) so a burst of downloads cannot open
+    more sockets than the fan-out actually needs, and the transport applies
+    ``SOCKET_OPTIONS`` and retries failed connection attempts. Calls pass
+    ``METADATA_TIMEOUT`` or ``TRANSFER_TIMEOUT`` explicitly; the former is
+    also the client default. Requests use paths relative to
+    ``GRAPH_BASE_URL``; absolute URLs (token endpoint, download redirects)
+    are passed through unchanged.
     """
     global graph_client
-    limits = httpx.Limits(max_keepalive_connections=None, max_connections=None)
-    timeout = httpx.Timeout(
-        connect=CONNECT_TIMEOUT,
-        read=REQUEST_TIMEOUT,
-        write=REQUEST_TIMEOUT,
-        pool=CONNECT_TIMEOUT,
+    limits = httpx.Limits(
+        max_connections=GRAPH_MAX_CONNECTIONS,
+        max_keepalive_connections=GRAPH_MAX_KEEPALIVE,
+        keepalive_expiry=KEEPALIVE_EXPIRY,
+    )
+    transport = httpx.AsyncHTTPTransport(
+        http2=True, limits=limits, retries=2, socket_options=SOCKET_OPTIONS
+    )
+    graph_client = httpx.AsyncClient(
+        base_url=GRAPH_BASE_URL, transport=transport, timeout=METADATA_TIMEOUT
     )
-    graph_client = httpx.AsyncClient(limits=limits, timeout=timeout)
 
 
 async def close_graph_client() -> None:
@@ -42,23 +111,33 @@ async def close_graph_client() -> None:
     if graph_client is not None:
         await graph_client.aclose()
 
+# Tokens are refreshed in the background once they are this close to expiry
+# and on the request path once they are closer than ``EXPIRY_MARGIN``
+REFRESH_MARGIN = 300
+EXPIRY_MARGIN = 60
+
 _cached_token: Optional[str] = None
 _token_expiry: float = 0.0
+# Authorization header built once per token rather than once per request
+_cached_headers: Optional[Dict[str, str]] = None
+_refresh_lock = asyncio.Lock()
+_refresh_task: Optional[asyncio.Task] = None
 
 
-async def _get_token() -> str:
-    """Return a valid access token for Microsoft Graph."""
-    global _cached_token, _token_expiry
+def _set_token(token: str, expires_in: float) -> str:
+    """Store ``token`` and the matching Authorization header."""
+    global _cached_token, _token_expiry, _cached_headers
+    _cached_token = token
+    _token_expiry = time.time() + expires_in
+    _cached_headers = {"Authorization": f"Bearer {token}"}
+    return token
 
-    # Reuse token if it's still valid for at least 1 minute
-    if _cached_token and time.time() < _token_expiry - 60:
-        return _cached_token
 
+async def _fetch_token() -> str:
+    """Request a new access token and cache it."""
     env_token = os.getenv("GRAPH_TOKEN")
     if env_token:
-        _cached_token = env_token
-        _token_expiry = time.time() + 3600
-        return _cached_token
+        return _set_token(env_token, 3600)
 
     client_id = os.getenv("GRAPH_CLIENT_ID")
     tenant_id = os.getenv("GRAPH_TENANT_ID")
@@ -76,80 +155,477 @@ async def _get_token() -> str:
             "scope": "https://graph.microsoft.com/.default",
             "grant_type": "client_credentials",
         },
+        timeout=METADATA_TIMEOUT,
     )
     response.raise_for_status()
-    data = response.json()
-    _cached_token = data["access_token"]
-    _token_expiry = time.time() + int(data.get("expires_in", 3600))
-    return _cached_token
+    data = _json(response)
+    return _set_token(data["access_token"], int(data.get("expires_in", 3600)))
+
+
+async def _refresh_token() -> str:
+    """Fetch a new token unless a concurrent refresh already did."""
+    async with _refresh_lock:
+        if _cached_token and time.time() < _token_expiry - REFRESH_MARGIN:
+            return _cached_token
+        return await _fetch_token()
+
+
+def _schedule_refresh() -> None:
+    """Start a background token refresh if one is not already running."""
+    global _refresh_task
+    if _refresh_task is None or _refresh_task.done():
+        _refresh_task = asyncio.create_task(_refresh_token())
+        # A failed background refresh is retried by the next caller; retrieve
+        # the exception so it is not reported as unhandled.
+        _refresh_task.add_done_callback(
+            lambda task: task.cancelled() or task.exception()
+        )
+
+
+async def _get_token() -> str:
+    """Return a valid access token for Microsoft Graph.
+
+    Fresh tokens are returned as is. Within ``REFRESH_MARGIN`` of expiry the
+    current token is still returned while a replacement is fetched in the
+    background, so requests only wait for a refresh once the token is within
+    ``EXPIRY_MARGIN`` of expiring (or none has been fetched yet).
+    """
+    now = time.time()
+    if _cached_token and now < _token_expiry - REFRESH_MARGIN:
+        return _cached_token
+    if _cached_token and now < _token_expiry - EXPIRY_MARGIN:
+        _schedule_refresh()
+        return _cached_token
+    return await _refresh_token()
 
 
 async def _auth_headers() -> Dict[str, str]:
-    token = await _get_token()
-    return {"Authorization": f"Bearer {token}"}
+    """Return the Authorization header for the current token.
+
+    The same dict is returned until the token is refreshed; callers must not
+    mutate it.
+    """
+    if _cached_headers is None or time.time() >= _token_expiry - REFRESH_MARGIN:
+        await _get_token()
+    return _cached_headers
+
+
+def _ttl_cache(
+    ttl: float, maxsize: int = 1024
+) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+    """Cache an async function's results for ``ttl`` seconds.
+
+    Results are keyed by the bound arguments, whether passed positionally or
+    by keyword, except ``headers``, which does not affect the result. Failed
+    calls are not cached and the least recently used entry is evicted beyond
+    ``maxsize``.
+    """
+
+    def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        cache: "OrderedDict[tuple, Tuple[float, Any]]" = OrderedDict()
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = tuple(
+                value for name, value in bound.arguments.items() if name != "headers"
+            )
+            entry = cache.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                cache.move_to_end(key)
+                return entry[1]
+            result = await func(*args, **kwargs)
+            cache[key] = (time.monotonic() + ttl, result)
+            cache.move_to_end(key)
+            if len(cache) > maxsize:
+                cache.popitem(last=False)
+            return result
+
+        wrapper.cache_clear = cache.clear  # type: ignore[attr-defined]
+        return wrapper
+
+    return decorator
+
+
+def _json(response: httpx.Response) -> Any:
+    """Parse a JSON response body with orjson, straight from the raw bytes."""
+    return orjson.loads(response.content)
+
+
+def _backoff(attempt: int) -> float:
+    """Return a jittered exponential delay before retry ``attempt + 1``."""
+    return min(2 ** attempt, MAX_BACKOFF) + random.uniform(0, 0.5)
+
+
+def _throttle_delay(response: httpx.Response, attempt: int) -> float:
+    """Return how long to wait before retrying a throttled response.
+
+    Graph's ``Retry-After`` interval is honoured when present; otherwise the
+    usual exponential backoff applies.
+    """
+    try:
+        retry_after = float(response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return _backoff(attempt)
+    return retry_after + random.uniform(0, 0.2)
+
+
+async def _request(
+    method: str, url: str, retries: int = 3, **kwargs: Any
+) -> httpx.Response:
+    """Send a Graph request, retrying connection errors and throttling.
+
+    ``kwargs`` are passed to ``graph_client.request`` and must be replayable
+    (no streaming bodies). Error statuses other than throttling are raised
+    as ``HTTPStatusError`` without retrying.
+    """
+    for attempt in range(retries):
+        try:
+            response = await graph_client.request(method, url, **kwargs)
+        except httpx.RequestError:
+            if attempt == retries - 1:
+                raise
+            await asyncio.sleep(_backoff(attempt))
+            continue
+        if response.status_code in THROTTLE_STATUS_CODES and attempt < retries - 1:
+            await asyncio.sleep(_throttle_delay(response, attempt))
+            continue
+        response.raise_for_status()
+        return response
+
+    # Retries exhausted
+    raise httpx.HTTPError("Max retries exceeded")
 
 
-async def download_file_from_graph(drive_id: str, item_id: str, retries: int = 3) -> bytes:
-    """Return the file content for the given drive and item.
+def _content_disposition_filename(value: Optional[str]) -> str:
+    """Return the file name given by a Content-Disposition header.
+
+    The RFC 6266 ``filename*`` parameter (which carries non-ASCII names) is
+    preferred over the plain ``filename`` fallback.
+    """
+    if not value:
+        return ""
+    message = Message()
+    message["Content-Disposition"] = value
+    # ``filename*`` is decoded into a (charset, language, value) tuple stored
+    # under ``filename``, alongside the plain parameter
+    names = [
+        name
+        for key, name in message.get_params([], header="content-disposition")
+        if key.lower() == "filename"
+    ]
+    for name in names:
+        if isinstance(name, tuple):
+            return collapse_rfc2231_value(name)
+    return collapse_rfc2231_value(names[0]) if names else ""
+
+
+async def _gather_settled(*aws: Awaitable[Any]) -> List[Any]:
+    """Await ``aws`` concurrently and return their results in order.
+
+    Unlike a plain ``asyncio.gather`` every awaitable is left to finish
+    before the first exception is re-raised, so none is still writing when
+    the caller cleans up the files they were working on.
+    """
+    results = await asyncio.gather(*aws, return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
+
+
+async def _write_response(response: httpx.Response, dest: Path) -> None:
+    """Write a streamed response body to ``dest`` chunk by chunk."""
+    with dest.open("wb") as fh:
+        async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+            fh.write(chunk)
+
+
+async def stream_file_from_graph(
+    drive_id: str,
+    item_id: str,
+    dest: Path,
+    retries: int = 3,
+    headers: Optional[Dict[str, str]] = None,
+) -> str:
+    """Download the given drive item directly into ``dest``.
+
+    The body is written to disk chunk by chunk so the file content is never
+    held in memory as a whole. Returns the file name Graph reports in the
+    ``Content-Disposition`` header, or an empty string when the header is
+    missing.
 
     This function manually follows redirects. Some environments or older
     versions of ``httpx`` may not respect the ``follow_redirects`` flag,
     resulting in ``HTTPStatusError`` for 302 responses. To ensure the file is
     downloaded reliably we iterate through up to 5 redirects ourselves.
+    Only the initial Graph request carries the Authorization header; the
+    redirect targets are pre-authenticated download URLs. Throttled responses
+    (429/503) are retried after the ``Retry-After`` interval requested by
+    Graph. Callers issuing many requests may pass ``headers`` from
+    :func:`_auth_headers` to skip looking them up again.
     """
 
-    url = f"{GRAPH_BASE_URL}/drives/{drive_id}/items/{item_id}/content"
-    headers = await _auth_headers()
+    url = f"/drives/{drive_id}/items/{item_id}/content"
+    if headers is None:
+        headers = await _auth_headers()
 
     for attempt in range(retries):
         next_url = url
+        delay = 0.0
         try:
-            for _ in range(5):
-                response = await graph_client.get(next_url, headers=headers)
-                if response.is_redirect:
-                    next_url = response.headers.get("location")
-                    if not next_url:
-                        response.raise_for_status()
-                    continue
+            for hop in range(5):
+                async with graph_client.stream(
+                    "GET",
+                    next_url,
+                    headers=headers if hop == 0 else None,
+                    timeout=TRANSFER_TIMEOUT,
+                ) as response:
+                    if response.is_redirect and response.headers.get("location"):
+                        next_url = response.headers["location"]
+                        continue
+                    if (
+                        response.status_code in THROTTLE_STATUS_CODES
+                        and attempt < retries - 1
+                    ):
+                        delay = _throttle_delay(response, attempt)
+                        break
+                    response.raise_for_status()
+                    await _write_response(response, dest)
+                    return _content_disposition_filename(
+                        response.headers.get("Content-Disposition")
+                    )
+            else:
+                # Still redirecting after 5 hops
                 response.raise_for_status()
-                return response.content
-            response.raise_for_status()
         except httpx.RequestError:
             if attempt == retries - 1:
                 raise
-            await asyncio.sleep(2 ** attempt)
+            delay = _backoff(attempt)
+        await asyncio.sleep(delay)
 
     # Retries exhausted
     raise httpx.HTTPError("Max retries exceeded")
 
 
+# Matches an unescaped ``webUrl`` value in an item metadata response
+_WEB_URL_RE = re.compile(rb'"webUrl"\s*:\s*"([^"\\]*)"')
+
+
+def _web_url(response: httpx.Response) -> str:
+    """Return the ``webUrl`` of the item metadata in ``response``.
+
+    Upload responses carry several KB of metadata but only ``webUrl`` is
+    needed, so it is picked out of the raw body; the full JSON is only
+    parsed when the value is absent or contains escapes.
+    """
+    match = _WEB_URL_RE.search(response.content)
+    if match:
+        return match.group(1).decode()
+    return _json(response).get("webUrl", "")
+
+
+async def _upload_session(
+    drive_id: str, folder_id: str, filename: str, fh: BinaryIO, size: int
+) -> str:
+    """Upload ``fh`` in fragments through a Graph upload session."""
+    url = f"/drives/{drive_id}/items/{folder_id}:/{filename}:/createUploadSession"
+    response = await _request(
+        "POST",
+        url,
+        headers=await _auth_headers(),
+        json={"item": {"@microsoft.graph.conflictBehavior": "replace"}},
+        timeout=METADATA_TIMEOUT,
+    )
+    upload_url = _json(response)["uploadUrl"]
+
+    # Graph requires fragments in order, so they are sent one at a time. The
+    # upload URL is pre-authenticated and must not carry an Authorization
+    # header.
+    offset = 0
+    while offset < size:
+        chunk = await asyncio.to_thread(fh.read, UPLOAD_SESSION_CHUNK_SIZE)
+        if not chunk:
+            raise ValueError("File ended before the upload completed")
+        end = offset + len(chunk) - 1
+        response = await _request(
+            "PUT",
+            upload_url,
+            headers={"Content-Range": f"bytes {offset}-{end}/{size}"},
+            content=chunk,
+            timeout=TRANSFER_TIMEOUT,
+        )
+        offset = end + 1
+    # The response to the final fragment is the created item
+    return _web_url(response)
+
+
 async def upload_file_to_graph(
-    drive_id: str, folder_id: str, filename: str, content: bytes
+    drive_id: str, folder_id: str, filename: str, content: Union[bytes, BinaryIO]
 ) -> str:
-    """Upload binary content and return the resulting file web URL."""
-    url = f"{GRAPH_BASE_URL}/drives/{drive_id}/items/{folder_id}:/{filename}:/content"
-    response = await graph_client.put(url, headers=await _auth_headers(), data=content)
-    response.raise_for_status()
-    data = response.json()
-    # The Graph API returns the uploaded item metadata including a ``webUrl`` key
-    return data.get("webUrl", "")
+    """Upload binary content and return the resulting file web URL.
+
+    ``content`` may be a bytes object or a file opened in binary mode. Files
+    larger than ``SMALL_UPLOAD_LIMIT`` go through an upload session, which
+    has no size cap and keeps only one fragment in memory; smaller files are
+    read whole so the request can be replayed if Graph throttles it.
+    """
+    url = f"/drives/{drive_id}/items/{folder_id}:/{filename}:/content"
+    if isinstance(content, bytes):
+        body = content
+    else:
+        size = os.fstat(content.fileno()).st_size
+        if size > SMALL_UPLOAD_LIMIT:
+            return await _upload_session(drive_id, folder_id, filename, content, size)
+        body = await asyncio.to_thread(content.read)
+    response = await _request(
+        "PUT",
+        url,
+        headers=await _auth_headers(),
+        content=body,
+        timeout=TRANSFER_TIMEOUT,
+    )
+    return _web_url(response)
 
 
+@_ttl_cache(FOLDER_LISTING_CACHE_TTL)
 async def list_folder_children(
-    drive_id: str, folder_id: str
+    drive_id: str, folder_id: str, headers: Optional[Dict[str, str]] = None
 ) -> Iterable[Dict[str, str]]:
-    """Return metadata for items within the folder."""
-    url = f"{GRAPH_BASE_URL}/drives/{drive_id}/items/{folder_id}/children"
-    response = await graph_client.get(url, headers=await _auth_headers())
-    response.raise_for_status()
-    data = response.json()
-    return data.get("value", [])
-
+    """Return the ``id`` and ``name`` of every item within the folder.
 
-async def get_item_name(drive_id: str, item_id: str) -> str:
-    """Return the file name for the given item."""
-    url = f"{GRAPH_BASE_URL}/drives/{drive_id}/items/{item_id}"
-    response = await graph_client.get(url, headers=await _auth_headers())
-    response.raise_for_status()
-    data = response.json()
+    Graph pages folder listings; all pages are followed, requesting the
+    largest page size and only the fields callers use. Listings are cached
+    briefly so retried jobs do not list the folder again; callers must not
+    mutate the returned list.
+    """
+    url: Optional[str] = f"/drives/{drive_id}/items/{folder_id}/children"
+    params: Optional[Dict[str, str]] = {"$top": "999", "$select": "id,name"}
+    if headers is None:
+        headers = await _auth_headers()
+    items: List[Dict[str, str]] = []
+    while url:
+        response = await _request(
+            "GET", url, headers=headers, params=params, timeout=METADATA_TIMEOUT
+        )
+        data = _json(response)
+        items.extend(data.get("value", []))
+        # The next link is absolute and already carries the query
+        url = data.get("@odata.nextLink")
+        params = None
+    return items
+
+
+@_ttl_cache(ITEM_NAME_CACHE_TTL)
+async def get_item_name(
+    drive_id: str, item_id: str, headers: Optional[Dict[str, str]] = None
+) -> str:
+    """Return the file name for the given item (cached for a minute)."""
+    url = f"/drives/{drive_id}/items/{item_id}"
+    if headers is None:
+        headers = await _auth_headers()
+    response = await _request("GET", url, headers=headers, timeout=METADATA_TIMEOUT)
+    data = _json(response)
     return data.get("name", "")
+
+
+async def graph_batch(
+    requests: List[Dict[str, str]], headers: Optional[Dict[str, str]] = None
+) -> List[httpx.Response]:
+    """Send several Graph requests in a single ``$batch`` round trip.
+
+    Each entry in ``requests`` needs a ``method`` and a ``url`` relative to
+    ``GRAPH_BASE_URL``. The sub-responses are returned as ``httpx.Response``
+    objects in the same order as ``requests`` so callers can use
+    ``raise_for_status()`` and ``json()`` exactly as with a direct request.
+    """
+    if len(requests) > BATCH_LIMIT:
+        raise ValueError(f"Graph batches are limited to {BATCH_LIMIT} requests")
+
+    payload = {
+        "requests": [
+            {"id": str(idx), "method": req["method"], "url": req["url"]}
+            for idx, req in enumerate(requests)
+        ]
+    }
+    if headers is None:
+        headers = await _auth_headers()
+    response = await _request(
+        "POST", "/$batch", headers=headers, json=payload, timeout=METADATA_TIMEOUT
+    )
+
+    # Graph may return sub-responses in any order
+    by_id = {sub["id"]: sub for sub in _json(response).get("responses", [])}
+    results = []
+    for idx, req in enumerate(requests):
+        sub = by_id.get(str(idx), {"status": 500, "body": None})
+        results.append(
+            httpx.Response(
+                status_code=sub["status"],
+                headers=sub.get("headers"),
+                json=sub.get("body"),
+                request=httpx.Request(req["method"], f"{GRAPH_BASE_URL}{req['url']}"),
+            )
+        )
+    return results
+
+
+async def batch_download_from_graph(
+    drive_id: str, destinations: Dict[str, Path], retries: int = 3
+) -> None:
+    """Download several drive items, writing each one to its destination.
+
+    ``destinations`` maps item ids to the paths their content is streamed to.
+    Download URLs are resolved with one ``$batch`` request per
+    ``BATCH_LIMIT`` items: Graph answers each ``/content`` sub-request with a
+    redirect to a pre-authenticated URL, which is fetched without the
+    Authorization header. Items whose sub-request is not a redirect (for
+    example because it was throttled) or whose download fails fall back to
+    :func:`stream_file_from_graph` and its retry handling.
+    """
+    # Read once for all batch requests, which are sent straight away
+    headers = await _auth_headers()
+    semaphore = asyncio.BoundedSemaphore(DOWNLOAD_CONCURRENCY)
+
+    async def fetch(item_id: str, response: httpx.Response) -> None:
+        dest = destinations[item_id]
+        async with semaphore:
+            if response.is_redirect:
+                try:
+                    async with graph_client.stream(
+                        "GET", response.headers["location"], timeout=TRANSFER_TIMEOUT
+                    ) as download:
+                        download.raise_for_status()
+                        await _write_response(download, dest)
+                    return
+                except httpx.HTTPError:
+                    pass
+            # Fallbacks may run long after the batch, so each one looks up
+            # the current token rather than reusing ``headers``
+            await stream_file_from_graph(drive_id, item_id, dest, retries=retries)
+
+    item_ids = list(destinations)
+    chunks = [
+        item_ids[start : start + BATCH_LIMIT]
+        for start in range(0, len(item_ids), BATCH_LIMIT)
+    ]
+    # Build the per-drive prefix once rather than for every sub-request
+    items_path = f"/drives/{drive_id}/items"
+    batches = await asyncio.gather(
+        *(
+            graph_batch(
+                [
+                    {"method": "GET", "url": f"{items_path}/{item_id}/content"}
+                    for item_id in chunk
+                ],
+                headers=headers,
+            )
+            for chunk in chunks
+        )
+    )
+    responses = [response for batch in batches for response in batch]
+    await _gather_settled(
+        *(fetch(item_id, response) for item_id, response in zip(item_ids, responses))
+    )
@@ -9,3 +9,13 @@ graceful_timeout = 30
 
 # Bind to the port expected by Azure App Service
 bind = "0.0.0.0:80"
+
+# The API is asynchronous; the default sync worker would serve one request at
+# a time. Each async worker handles many requests concurrently and already
+# fans CPU-bound work out to PDF and ffmpeg processes, so a few workers
+# suffice. The app is not preloaded so every worker creates its own HTTP
+# connection pool. The worker class comes from the ``uvicorn-worker`` package;
+# ``uvicorn.workers`` is deprecated.
+worker_class = "uvicorn_worker.UvicornWorker"
+workers = int(os.getenv("WEB_CONCURRENCY", "4"))
+keepalive = 30
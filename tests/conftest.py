@@ -0,0 +1,11 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import extractor_api
+
+
+@pytest.fixture(scope="session")
+def client():
+    """Return a TestClient that has run the app's startup and shutdown hooks."""
+    with TestClient(extractor_api.app) as test_client:
+        yield test_client
@@ -0,0 +1,48 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+import extractor_api
+
+# 40 MPEG-1 Layer III frames (128 kbps, 44.1 kHz) of silence
+MP3_FRAMES = (b"\xff\xfb\x90\x64" + b"\x00" * 413) * 40
+
+
+async def test_duration_read_without_ffprobe(tmp_path):
+    path = tmp_path / "slide_1.mp3"
+    path.write_bytes(MP3_FRAMES)
+
+    with patch("extractor_api._ffprobe_duration", new_callable=AsyncMock) as mock_ffprobe:
+        (duration,) = await extractor_api.calculate_slide_durations([path])
+
+    assert duration == pytest.approx(40 * 1152 / 44100 + 2.0, abs=0.01)
+    mock_ffprobe.assert_not_called()
+
+
+async def test_duration_falls_back_to_ffprobe(tmp_path):
+    path = tmp_path / "slide_1.mp3"
+    path.write_bytes(b"data")
+
+    with patch(
+        "extractor_api._ffprobe_duration", new_callable=AsyncMock, return_value=2.5
+    ) as mock_ffprobe:
+        (duration,) = await extractor_api.calculate_slide_durations([path])
+
+    assert duration == 4.5
+    mock_ffprobe.assert_awaited_once_with(path)
+
+
+async def test_slide_durations_only_probe_unreadable_files(tmp_path):
+    good = tmp_path / "slide_1.mp3"
+    good.write_bytes(MP3_FRAMES)
+    bad = tmp_path / "slide_2.mp3"
+    bad.write_bytes(b"data")
+
+    with patch(
+        "extractor_api._ffprobe_duration", new_callable=AsyncMock, return_value=2.5
+    ) as mock_ffprobe:
+        durations = await extractor_api.calculate_slide_durations([good, bad])
+
+    assert durations[0] == pytest.approx(40 * 1152 / 44100 + 2.0, abs=0.01)
+    assert durations[1] == 4.5
+    mock_ffprobe.assert_awaited_once_with(bad)
@@ -1,13 +1,13 @@
+import asyncio
 import subprocess
 from types import SimpleNamespace
 from unittest.mock import AsyncMock, patch
 
-from fastapi.testclient import TestClient
+import pytest
+from fastapi import BackgroundTasks
 
 import extractor_api
 
-client = TestClient(extractor_api.app)
-
 
 def _run_factory(images, raise_ffmpeg=False, ffprobe_error=None, raise_libreoffice=False):
     async def _run(cmd):
@@ -20,9 +20,12 @@ def _run_factory(images, raise_ffmpeg=False, ffprobe_error=None, raise_libreoffi
         if cmd[0] == "libreoffice":
             if raise_libreoffice:
                 raise FileNotFoundError("libreoffice")
-            outdir = cmd[-1]
+            (extractor_api.Path(cmd[-1]) / "presentation.pdf").write_bytes(b"pdf")
+            return SimpleNamespace()
+        if cmd[0] == "pdftoppm":
+            outdir = extractor_api.Path(cmd[-1]).parent
             for name in images:
-                (extractor_api.Path(outdir) / name).write_bytes(b"img")
+                (outdir / name).write_bytes(b"img")
             return SimpleNamespace()
         if cmd[0] == "ffmpeg":
             if raise_ffmpeg:
@@ -34,21 +37,34 @@ def _run_factory(images, raise_ffmpeg=False, ffprobe_error=None, raise_libreoffi
     return _run
 
 
+def _write_audio(drive_id, destinations, **kwargs):
+    for path in destinations.values():
+        path.write_bytes(b"data")
+
+
+@patch(
+    "extractor_api.stream_file_from_graph",
+    new_callable=AsyncMock,
+    return_value="slides.pptx",
+)
 @patch("extractor_api.upload_file_to_graph", new_callable=AsyncMock)
 @patch("extractor_api.run_cmd", new_callable=AsyncMock)
 @patch("extractor_api.list_folder_children", new_callable=AsyncMock)
-@patch("extractor_api.get_item_name", new_callable=AsyncMock)
-@patch("extractor_api.download_file_from_graph", new_callable=AsyncMock)
+@patch("extractor_api.batch_download_from_graph", new_callable=AsyncMock)
+@pytest.mark.parametrize(
+    "images",
+    [["Slide-1.png", "Slide-2.png"], ["Slide1.png", "Slide2.png"]],
+    ids=["dash", "no-dash"],
+)
 def test_combine_success(
-    mock_download, mock_get_name, mock_list, mock_run, mock_upload
+    mock_download, mock_list, mock_run, mock_upload, mock_stream, images, client
 ):
-    mock_download.side_effect = lambda d, i: b"data"
-    mock_get_name.return_value = "slides.pptx"
+    mock_download.side_effect = _write_audio
     mock_list.return_value = [
         {"id": "a1", "name": "slide_1.mp3"},
         {"id": "a2", "name": "slide_2.mp3"},
     ]
-    mock_run.side_effect = _run_factory(["Slide-1.png", "Slide-2.png"])
+    mock_run.side_effect = _run_factory(images)
     mock_upload.return_value = "http://example.com/video.mp4"
 
     res = client.post(
@@ -58,25 +74,31 @@ def test_combine_success(
     assert res.status_code == 200
     data = res.json()
     assert data["status"] == "success"
-    assert data["video_filename"].endswith(".mp4")
+    assert data["video_filename"] == "slides.mp4"
     mock_upload.assert_called_once()
+    ffmpeg_cmds = [
+        call.args[0] for call in mock_run.await_args_list if call.args[0][0] == "ffmpeg"
+    ]
+    # One segment per slide, then a stream-copy concat
+    assert len(ffmpeg_cmds) == 3
+    assert "concat" in ffmpeg_cmds[-1]
 
 
+@patch(
+    "extractor_api.stream_file_from_graph",
+    new_callable=AsyncMock,
+    return_value="segment_0.pptx",
+)
 @patch("extractor_api.upload_file_to_graph", new_callable=AsyncMock)
 @patch("extractor_api.run_cmd", new_callable=AsyncMock)
 @patch("extractor_api.list_folder_children", new_callable=AsyncMock)
-@patch("extractor_api.get_item_name", new_callable=AsyncMock)
-@patch("extractor_api.download_file_from_graph", new_callable=AsyncMock)
-def test_combine_slide_names_without_dash(
-    mock_download, mock_get_name, mock_list, mock_run, mock_upload
+@patch("extractor_api.batch_download_from_graph", new_callable=AsyncMock)
+def test_combine_output_named_like_segment(
+    mock_download, mock_list, mock_run, mock_upload, mock_stream, client
 ):
-    mock_download.side_effect = lambda d, i: b"data"
-    mock_get_name.return_value = "slides.pptx"
-    mock_list.return_value = [
-        {"id": "a1", "name": "slide_1.mp3"},
-        {"id": "a2", "name": "slide_2.mp3"},
-    ]
-    mock_run.side_effect = _run_factory(["Slide1.png", "Slide2.png"])
+    mock_download.side_effect = _write_audio
+    mock_list.return_value = [{"id": "a1", "name": "slide_1.mp3"}]
+    mock_run.side_effect = _run_factory(["Slide-1.png"])
     mock_upload.return_value = "http://example.com/video.mp4"
 
     res = client.post(
@@ -84,21 +106,28 @@ def test_combine_slide_names_without_dash(
         json={"drive_id": "d", "folder_id": "f", "pptx_file_id": "p"},
     )
     assert res.status_code == 200
-    data = res.json()
-    assert data["status"] == "success"
-    mock_upload.assert_called_once()
+    assert res.json()["video_filename"] == "segment_0.mp4"
+    segment_cmd, concat_cmd = [
+        call.args[0] for call in mock_run.await_args_list if call.args[0][0] == "ffmpeg"
+    ]
+    assert concat_cmd[-1] != segment_cmd[-1]
 
 
-@patch("extractor_api.list_folder_children", new_callable=AsyncMock, return_value=[])
 @patch(
-    "extractor_api.get_item_name", new_callable=AsyncMock, return_value="slides.pptx"
+    "extractor_api.stream_file_from_graph",
+    new_callable=AsyncMock,
+    return_value="slides.pptx",
+)
+@patch(
+    "extractor_api.list_folder_children",
+    new_callable=AsyncMock,
+    return_value=[],
 )
 @patch(
-    "extractor_api.download_file_from_graph",
+    "extractor_api.batch_download_from_graph",
     new_callable=AsyncMock,
-    return_value=b"data",
 )
-def test_combine_no_mp3(mock_download, mock_get_name, mock_list):
+def test_combine_no_mp3(mock_download, mock_list, mock_stream, client):
     res = client.post(
         "/combine",
         json={"drive_id": "d", "folder_id": "f", "pptx_file_id": "p"},
@@ -108,16 +137,20 @@ def test_combine_no_mp3(mock_download, mock_get_name, mock_list):
 
 
 @patch(
-    "extractor_api.get_item_name",
+    "extractor_api.stream_file_from_graph",
     new_callable=AsyncMock,
     side_effect=RuntimeError("fail"),
 )
 @patch(
-    "extractor_api.download_file_from_graph",
+    "extractor_api.list_folder_children",
     new_callable=AsyncMock,
-    return_value=b"data",
+    return_value=[],
 )
-def test_combine_graph_error(mock_download, mock_get_name):
+@patch(
+    "extractor_api.batch_download_from_graph",
+    new_callable=AsyncMock,
+)
+def test_combine_graph_error(mock_download, mock_list, mock_stream, client):
     res = client.post(
         "/combine",
         json={"drive_id": "d", "folder_id": "f", "pptx_file_id": "p"},
@@ -126,17 +159,41 @@ def test_combine_graph_error(mock_download, mock_get_name):
     assert res.json()["detail"] == "Unable to download PPTX"
 
 
+@patch(
+    "extractor_api.stream_file_from_graph",
+    new_callable=AsyncMock,
+    return_value="slides.pptx",
+)
+@patch(
+    "extractor_api.list_folder_children",
+    new_callable=AsyncMock,
+    side_effect=RuntimeError("fail"),
+)
+def test_combine_list_error(mock_list, mock_stream, client):
+    res = client.post(
+        "/combine",
+        json={"drive_id": "d", "folder_id": "f", "pptx_file_id": "p"},
+    )
+    assert res.status_code == 400
+    assert res.json()["detail"] == "Unable to list folder"
+
+
+@patch(
+    "extractor_api.stream_file_from_graph",
+    new_callable=AsyncMock,
+    return_value="slides.pptx",
+)
 @patch("extractor_api.upload_file_to_graph", new_callable=AsyncMock)
 @patch("extractor_api.run_cmd", new_callable=AsyncMock)
 @patch("extractor_api.list_folder_children", new_callable=AsyncMock)
-@patch("extractor_api.get_item_name", new_callable=AsyncMock)
-@patch("extractor_api.download_file_from_graph", new_callable=AsyncMock)
+@patch("extractor_api.batch_download_from_graph", new_callable=AsyncMock)
 def test_combine_missing_binary(
-    mock_download, mock_get_name, mock_list, mock_run, mock_upload
+    mock_download, mock_list, mock_run, mock_upload, mock_stream, client
 ):
-    mock_download.side_effect = lambda d, i: b"data"
-    mock_get_name.return_value = "slides.pptx"
-    mock_list.return_value = [{"id": "a1", "name": "slide_1.mp3"}]
+    mock_download.side_effect = _write_audio
+    mock_list.return_value = [
+        {"id": "a1", "name": "slide_1.mp3"},
+    ]
     mock_run.side_effect = _run_factory(["Slide-1.png"], raise_ffmpeg=True)
 
     res = client.post(
@@ -147,17 +204,22 @@ def test_combine_missing_binary(
     assert res.json()["detail"] == "ffmpeg is not installed"
 
 
+@patch(
+    "extractor_api.stream_file_from_graph",
+    new_callable=AsyncMock,
+    return_value="slides.pptx",
+)
 @patch("extractor_api.upload_file_to_graph", new_callable=AsyncMock)
 @patch("extractor_api.run_cmd", new_callable=AsyncMock)
 @patch("extractor_api.list_folder_children", new_callable=AsyncMock)
-@patch("extractor_api.get_item_name", new_callable=AsyncMock)
-@patch("extractor_api.download_file_from_graph", new_callable=AsyncMock)
+@patch("extractor_api.batch_download_from_graph", new_callable=AsyncMock)
 def test_combine_ffprobe_error(
-    mock_download, mock_get_name, mock_list, mock_run, mock_upload
+    mock_download, mock_list, mock_run, mock_upload, mock_stream, client
 ):
-    mock_download.side_effect = lambda d, i: b"data"
-    mock_get_name.return_value = "slides.pptx"
-    mock_list.return_value = [{"id": "a1", "name": "slide_1.mp3"}]
+    mock_download.side_effect = _write_audio
+    mock_list.return_value = [
+        {"id": "a1", "name": "slide_1.mp3"},
+    ]
     mock_run.side_effect = _run_factory(["Slide-1.png"], ffprobe_error="process")
 
     res = client.post(
@@ -168,17 +230,22 @@ def test_combine_ffprobe_error(
     assert res.json()["detail"] == "Audio metadata extraction failed"
 
 
+@patch(
+    "extractor_api.stream_file_from_graph",
+    new_callable=AsyncMock,
+    return_value="slides.pptx",
+)
 @patch("extractor_api.upload_file_to_graph", new_callable=AsyncMock)
 @patch("extractor_api.run_cmd", new_callable=AsyncMock)
 @patch("extractor_api.list_folder_children", new_callable=AsyncMock)
-@patch("extractor_api.get_item_name", new_callable=AsyncMock)
-@patch("extractor_api.download_file_from_graph", new_callable=AsyncMock)
+@patch("extractor_api.batch_download_from_graph", new_callable=AsyncMock)
 def test_combine_ffprobe_missing(
-    mock_download, mock_get_name, mock_list, mock_run, mock_upload
+    mock_download, mock_list, mock_run, mock_upload, mock_stream, client
 ):
-    mock_download.side_effect = lambda d, i: b"data"
-    mock_get_name.return_value = "slides.pptx"
-    mock_list.return_value = [{"id": "a1", "name": "slide_1.mp3"}]
+    mock_download.side_effect = _write_audio
+    mock_list.return_value = [
+        {"id": "a1", "name": "slide_1.mp3"},
+    ]
     mock_run.side_effect = _run_factory(["Slide-1.png"], ffprobe_error="file")
 
     res = client.post(
@@ -189,17 +256,22 @@ def test_combine_ffprobe_missing(
     assert res.json()["detail"] == "ffprobe is not installed"
 
 
+@patch(
+    "extractor_api.stream_file_from_graph",
+    new_callable=AsyncMock,
+    return_value="slides.pptx",
+)
 @patch("extractor_api.upload_file_to_graph", new_callable=AsyncMock)
 @patch("extractor_api.run_cmd", new_callable=AsyncMock)
 @patch("extractor_api.list_folder_children", new_callable=AsyncMock)
-@patch("extractor_api.get_item_name", new_callable=AsyncMock)
-@patch("extractor_api.download_file_from_graph", new_callable=AsyncMock)
+@patch("extractor_api.batch_download_from_graph", new_callable=AsyncMock)
 def test_combine_libreoffice_missing(
-    mock_download, mock_get_name, mock_list, mock_run, mock_upload
+    mock_download, mock_list, mock_run, mock_upload, mock_stream, client
 ):
-    mock_download.side_effect = lambda d, i: b"data"
-    mock_get_name.return_value = "slides.pptx"
-    mock_list.return_value = [{"id": "a1", "name": "slide_1.mp3"}]
+    mock_download.side_effect = _write_audio
+    mock_list.return_value = [
+        {"id": "a1", "name": "slide_1.mp3"},
+    ]
     mock_run.side_effect = _run_factory(
         ["Slide-1.png"], raise_libreoffice=True
     )
@@ -212,16 +284,19 @@ def test_combine_libreoffice_missing(
     assert res.json()["detail"] == "libreoffice is not installed"
 
 
+@patch(
+    "extractor_api.stream_file_from_graph",
+    new_callable=AsyncMock,
+    return_value="slides.pptx",
+)
 @patch("extractor_api.upload_file_to_graph", new_callable=AsyncMock)
 @patch("extractor_api.run_cmd", new_callable=AsyncMock)
 @patch("extractor_api.list_folder_children", new_callable=AsyncMock)
-@patch("extractor_api.get_item_name", new_callable=AsyncMock)
-@patch("extractor_api.download_file_from_graph", new_callable=AsyncMock)
+@patch("extractor_api.batch_download_from_graph", new_callable=AsyncMock)
 def test_combine_slide_count_mismatch(
-    mock_download, mock_get_name, mock_list, mock_run, mock_upload
+    mock_download, mock_list, mock_run, mock_upload, mock_stream, client
 ):
-    mock_download.side_effect = lambda d, i: b"data"
-    mock_get_name.return_value = "slides.pptx"
+    mock_download.side_effect = _write_audio
     mock_list.return_value = [
         {"id": "a1", "name": "slide_1.mp3"},
         {"id": "a2", "name": "slide_2.mp3"},
@@ -237,3 +312,28 @@ def test_combine_slide_count_mismatch(
 
     assert res.status_code == 400
     assert res.json()["detail"] == "Slide count mismatch"
+
+
+async def test_combine_cancelled_removes_working_directory(tmp_path, monkeypatch):
+    monkeypatch.setattr(extractor_api, "combine_tmp_root", tmp_path)
+    monkeypatch.setattr(
+        extractor_api,
+        "stream_file_from_graph",
+        AsyncMock(return_value="slides.pptx"),
+    )
+    monkeypatch.setattr(
+        extractor_api,
+        "list_folder_children",
+        AsyncMock(return_value=[{"id": "a1", "name": "slide_1.mp3"}]),
+    )
+    monkeypatch.setattr(
+        extractor_api,
+        "batch_download_from_graph",
+        AsyncMock(side_effect=asyncio.CancelledError),
+    )
+    request = extractor_api.CombineRequest(drive_id="d", folder_id="f", pptx_file_id="p")
+
+    with pytest.raises(asyncio.CancelledError):
+        await extractor_api.combine_presentation(request, BackgroundTasks())
+
+    assert list(tmp_path.iterdir()) == []
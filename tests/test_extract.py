@@ -1,118 +1,154 @@
-from types import SimpleNamespace
-from unittest.mock import AsyncMock, patch
-
+import io
+import zipfile
+from types import MappingProxyType
 
 import httpx
-
-from fastapi.testclient import TestClient
+import pptx
+import pytest
 
 import extractor_api
 
-client = TestClient(extractor_api.app)
+PPTX_CT = MappingProxyType(
+    {
+        "Content-Type": "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+    }
+)
+PLAIN_CT = MappingProxyType({"Content-Type": "text/plain"})
+EXTRACT_PAYLOAD = {"file_url": "https://example.com/file", "file_name": "file.pptx"}
 
 
-def _mock_response(content=b"", headers=None, status_code=200):
-    return httpx.Response(
-        status_code=status_code, content=content, headers=headers or {}
-    )
+@pytest.fixture
+def mock_http(monkeypatch):
+    """Return a function installing an ``http_client`` with a canned response.
+
+    The function returns the list the sent requests are recorded in.
+    """
+    # Differs from httpx's 5 s default so tests can tell it was applied
+    monkeypatch.setattr(extractor_api, "HTTPX_TIMEOUT", httpx.Timeout(7))
 
+    def serve(content=b"", headers=None, status_code=200, error=None):
+        sent = []
 
-class DummyPresentation:
-    def __init__(self, file_like):
-        self.slides = [
-            SimpleNamespace(
-                shapes=SimpleNamespace(title=SimpleNamespace(text="Title 1")),
-                has_notes_slide=True,
-                notes_slide=SimpleNamespace(
-                    notes_text_frame=SimpleNamespace(text="Notes 1")
-                ),
+        def handler(request):
+            sent.append(request)
+            if error is not None:
+                raise error(request)
+            return httpx.Response(
+                status_code=status_code, content=content, headers=headers or {}
             )
-        ]
 
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(extractor_api, "http_client", client)
+        return sent
 
-class FailingPresentation:
-    def __init__(self, file_like):
-        raise ValueError("bad file")
+    return serve
 
 
-@patch("extractor_api.HTTPX_TIMEOUT", httpx.Timeout(5))
-@patch("extractor_api.TIMEOUT", 5)
-@patch("extractor_api.http_client.get", new_callable=AsyncMock)
-@patch("extractor_api.Presentation", DummyPresentation)
-def test_accepts_pptx_without_extension(mock_presentation, mock_get):
-    headers = {
-        "Content-Type": "application/vnd.openxmlformats-officedocument.presentationml.presentation"
-    }
-    mock_get.return_value = _mock_response(b"content", headers)
-    res = client.post(
-        "/extract",
-        json={"file_url": "https://example.com/file", "file_name": "file.pptx"},
-    )
+def _deck_bytes(prs):
+    buf = io.BytesIO()
+    prs.save(buf)
+    return buf.getvalue()
+
+
+def _build_deck():
+    """Return a real python-pptx deck with a titled, annotated slide."""
+    prs = pptx.Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[0])
+    slide.shapes.title.text = "Title 1"
+    slide.notes_slide.notes_text_frame.text = "Notes 1"
+    return prs
+
+
+def test_accepts_pptx_without_extension(client, mock_http):
+    sent = mock_http(_deck_bytes(_build_deck()), PPTX_CT)
+    res = client.post("/extract", json=EXTRACT_PAYLOAD)
     assert res.status_code == 200
-    mock_get.assert_awaited_once_with(
-        "https://example.com/file",
-        timeout=extractor_api.HTTPX_TIMEOUT,
-        follow_redirects=True,
-    )
+    assert [str(r.url) for r in sent] == [EXTRACT_PAYLOAD["file_url"]]
+    assert sent[0].extensions["timeout"] == httpx.Timeout(7).as_dict()
     data = res.json()
     assert data["filename"] == "file.pptx"
     assert "file_content" not in data
     assert data["slide_count"] == 1
+    assert data["slides"] == [
+        {"slide_number": 1, "title_text": "Title 1", "notes_text": "Notes 1"}
+    ]
+
+
+def test_extract_slides_missing_title_and_notes():
+    prs = pptx.Presentation()
+    titled = prs.slides.add_slide(prs.slide_layouts[1])
+    titled.shapes.title.text = "First\vline"
+    titled.notes_slide.notes_text_frame.text = "Para 1\nPara 2"
+    prs.slides.add_slide(prs.slide_layouts[6])  # blank layout, no title
+
+    with zipfile.ZipFile(io.BytesIO(_deck_bytes(prs))) as archive:
+        slides = extractor_api._extract_slides(archive)
+    assert slides == [
+        {"slide_number": 1, "title_text": "First\vline", "notes_text": "Para 1\nPara 2"},
+        {"slide_number": 2, "title_text": None, "notes_text": None},
+    ]
 
 
-def test_health_endpoint():
+def test_health_endpoint(client):
     res = client.get("/health")
     assert res.status_code == 200
     assert res.json() == {"status": "ok"}
 
 
-@patch("extractor_api.HTTPX_TIMEOUT", httpx.Timeout(5))
-@patch("extractor_api.TIMEOUT", 5)
-@patch("extractor_api.http_client.get", new_callable=AsyncMock)
-@patch("extractor_api.Presentation", FailingPresentation)
-def test_invalid_pptx_returns_422(mock_presentation, mock_get):
-    headers = {"Content-Type": "text/plain"}
-    mock_get.return_value = _mock_response(b"bad", headers)
-    res = client.post(
-        "/extract",
-        json={"file_url": "https://example.com/file", "file_name": "file.pptx"},
-    )
+def test_invalid_pptx_returns_422(client, mock_http):
+    sent = mock_http(b"bad", PLAIN_CT)
+    res = client.post("/extract", json=EXTRACT_PAYLOAD)
     assert res.status_code == 422
     assert res.json()["detail"] == "Only .pptx files are supported"
-    mock_get.assert_awaited_once_with(
-        "https://example.com/file",
-        timeout=extractor_api.HTTPX_TIMEOUT,
-        follow_redirects=True,
-    )
+    assert [str(r.url) for r in sent] == [EXTRACT_PAYLOAD["file_url"]]
+
 
-@patch("extractor_api.HTTPX_TIMEOUT", httpx.Timeout(5))
-@patch("extractor_api.TIMEOUT", 5)
-@patch("extractor_api.http_client.get", new_callable=AsyncMock)
-def test_download_http_error(mock_get):
-    request = httpx.Request("GET", "https://example.com/file")
-    response = _mock_response(status_code=404)
-    mock_get.side_effect = httpx.HTTPStatusError("not found", request=request, response=response)
-    res = client.post("/extract", json={"file_url": "https://example.com/file", "file_name": "file.pptx"})
+def test_unparseable_pptx_returns_422(client, mock_http):
+    mock_http(b"bad", PPTX_CT)
+    res = client.post("/extract", json=EXTRACT_PAYLOAD)
+    assert res.status_code == 422
+    assert res.json()["detail"] == "Invalid .pptx file"
+
+
+def test_extract_slides_rejects_non_presentation_package():
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as archive:
+        archive.writestr(
+            "_rels/.rels",
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Target="xl/workbook.xml" Type="http://schemas.'
+            'openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+            "</Relationships>",
+        )
+        archive.writestr("xl/workbook.xml", "<workbook/>")
+    with zipfile.ZipFile(buf) as archive, pytest.raises(ValueError):
+        extractor_api._extract_slides(archive)
+
+
+def test_download_http_error(client, mock_http):
+    sent = mock_http(status_code=404)
+    res = client.post("/extract", json=EXTRACT_PAYLOAD)
     assert res.status_code == 400
     assert "Unable to download file" in res.json()["detail"]
-    mock_get.assert_awaited_once_with(
-        "https://example.com/file",
-        timeout=extractor_api.HTTPX_TIMEOUT,
-        follow_redirects=True,
-    )
+    assert [str(r.url) for r in sent] == [EXTRACT_PAYLOAD["file_url"]]
 
 
-@patch("extractor_api.HTTPX_TIMEOUT", httpx.Timeout(5))
-@patch("extractor_api.TIMEOUT", 5)
-@patch("extractor_api.http_client.get", new_callable=AsyncMock)
-def test_download_request_error(mock_get):
-    mock_get.side_effect = httpx.RequestError("boom", request=httpx.Request("GET", "https://example.com/file"))
-    res = client.post("/extract", json={"file_url": "https://example.com/file", "file_name": "file.pptx"})
+def test_download_request_error(client, mock_http):
+    sent = mock_http(
+        error=lambda request: httpx.ConnectError("boom", request=request)
+    )
+    res = client.post("/extract", json=EXTRACT_PAYLOAD)
     assert res.status_code == 400
     assert "Unable to download file" in res.json()["detail"]
-    mock_get.assert_awaited_once_with(
-        "https://example.com/file",
-        timeout=extractor_api.HTTPX_TIMEOUT,
-        follow_redirects=True,
-    )
+    assert [str(r.url) for r in sent] == [EXTRACT_PAYLOAD["file_url"]]
+
 
+def test_extract_client_keeps_no_cookies():
+    http_client = extractor_api._create_http_client()
+    response = httpx.Response(
+        status_code=200,
+        headers={"Set-Cookie": "session=abc"},
+        request=httpx.Request("GET", "https://example.com/file"),
+    )
+    http_client.cookies.extract_cookies(response)
+    assert not http_client.cookies
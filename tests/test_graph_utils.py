@@ -1,46 +1,412 @@
+import asyncio
+import inspect
+import json
+
 import httpx
 import pytest
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock
 
 import graph_utils
 
-@pytest.mark.asyncio
-async def test_download_file_follows_redirects():
-    mock_client = AsyncMock()
-    mock_client.get.return_value = httpx.Response(status_code=200, content=b"data")
-    with patch.object(graph_utils, "graph_client", mock_client), \
-         patch("graph_utils._auth_headers", new=AsyncMock(return_value={"Authorization": "Bearer t"})):
-        result = await graph_utils.download_file_from_graph("d1", "i1")
 
-    mock_client.get.assert_awaited_once_with(
+async def _fake_auth():
+    return {"Authorization": "Bearer t"}
+
+
+@pytest.fixture
+def mock_graph(monkeypatch):
+    """Return a function routing graph_utils through *handler* with a fixed token.
+
+    *handler* receives each ``httpx.Request`` and returns (or awaits to) the
+    response, as for ``httpx.MockTransport``. The function returns the list
+    the sent requests are recorded in.
+    """
+
+    def install(handler):
+        sent = []
+
+        async def record(request):
+            sent.append(request)
+            response = handler(request)
+            if inspect.isawaitable(response):
+                response = await response
+            return response
+
+        client = httpx.AsyncClient(
+            base_url=graph_utils.GRAPH_BASE_URL, transport=httpx.MockTransport(record)
+        )
+        monkeypatch.setattr(graph_utils, "graph_client", client)
+        monkeypatch.setattr(graph_utils, "_auth_headers", _fake_auth)
+        return sent
+
+    return install
+
+
+def _replay(responses):
+    """Return a handler answering with *responses* in order."""
+    pending = iter(responses)
+    return lambda request: next(pending)
+
+
+async def test_stream_file_sends_auth_to_graph(tmp_path, mock_graph):
+    handler = _replay([httpx.Response(status_code=200, content=b"data")])
+    calls = mock_graph(handler)
+    dest = tmp_path / "out.bin"
+    await graph_utils.stream_file_from_graph("d1", "i1", dest)
+
+    assert [str(r.url) for r in calls] == [
+        "https://graph.microsoft.com/v1.0/drives/d1/items/i1/content"
+    ]
+    assert calls[0].headers["Authorization"] == "Bearer t"
+    assert calls[0].extensions["timeout"] == graph_utils.TRANSFER_TIMEOUT.as_dict()
+    assert dest.read_bytes() == b"data"
+
+
+async def test_stream_file_multiple_redirects(tmp_path, mock_graph):
+    """stream_file_from_graph should follow redirect responses manually."""
+    # first two calls return redirects, final call returns data
+    handler = _replay(
+        [
+            httpx.Response(status_code=302, headers={"location": "https://r1"}),
+            httpx.Response(status_code=301, headers={"location": "https://r2"}),
+            httpx.Response(status_code=200, content=b"final"),
+        ]
+    )
+
+    calls = mock_graph(handler)
+    dest = tmp_path / "out.bin"
+    await graph_utils.stream_file_from_graph("d1", "i1", dest)
+
+    assert dest.read_bytes() == b"final"
+    assert [str(r.url) for r in calls] == [
         "https://graph.microsoft.com/v1.0/drives/d1/items/i1/content",
-        headers={"Authorization": "Bearer t"},
+        "https://r1",
+        "https://r2",
+    ]
+    assert [r.headers.get("Authorization") for r in calls] == ["Bearer t", None, None]
+    assert all(
+        r.extensions["timeout"] == graph_utils.TRANSFER_TIMEOUT.as_dict() for r in calls
     )
-    assert result == b"data"
 
 
-@pytest.mark.asyncio
-async def test_download_file_multiple_redirects():
-    """download_file_from_graph should follow redirect responses manually."""
-    mock_client = AsyncMock()
-    # first two calls return redirects, final call returns data
-    mock_client.get.side_effect = [
-        httpx.Response(status_code=302, headers={"location": "https://r1"}),
-        httpx.Response(status_code=301, headers={"location": "https://r2"}),
-        httpx.Response(status_code=200, content=b"final"),
+async def test_stream_file_follows_redirects_to_disk(tmp_path, mock_graph):
+    """stream_file_from_graph should write the final response body to disk."""
+
+    def handler(request):
+        if request.url.host != "r1":
+            return httpx.Response(status_code=302, headers={"location": "https://r1"})
+        return httpx.Response(
+            status_code=200,
+            headers={"Content-Disposition": 'attachment; filename="slides.pptx"'},
+            content=b"final",
+        )
+
+    dest = tmp_path / "out.bin"
+    seen = mock_graph(handler)
+    name = await graph_utils.stream_file_from_graph("d1", "i1", dest)
+
+    assert name == "slides.pptx"
+    assert dest.read_bytes() == b"final"
+    assert [str(r.url) for r in seen] == [
+        "https://graph.microsoft.com/v1.0/drives/d1/items/i1/content",
+        "https://r1",
+    ]
+    assert "Authorization" not in seen[1].headers
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ('attachment; filename="x.pptx"', "x.pptx"),
+        ("attachment; filename=\"x.pptx\"; filename*=UTF-8''y.pptx", "y.pptx"),
+        ("attachment; filename*=UTF-8''caf%C3%A9.pptx", "caf\u00e9.pptx"),
+        (None, ""),
+    ],
+)
+def test_content_disposition_filename_prefers_extended_name(value, expected):
+    assert graph_utils._content_disposition_filename(value) == expected
+
+
+async def test_auth_headers_are_cached(monkeypatch):
+    """The Authorization header dict should be reused while the token is valid."""
+    monkeypatch.setenv("GRAPH_TOKEN", "t")
+    monkeypatch.setattr(graph_utils, "_cached_token", None)
+    monkeypatch.setattr(graph_utils, "_cached_headers", None)
+    monkeypatch.setattr(graph_utils, "_token_expiry", 0.0)
+
+    first = await graph_utils._auth_headers()
+    second = await graph_utils._auth_headers()
+
+    assert first == {"Authorization": "Bearer t"}
+    assert first is second
+
+
+async def test_stale_token_is_refreshed_in_background(monkeypatch):
+    """A token close to expiry should be returned while a new one is fetched."""
+    for name in ("_cached_token", "_cached_headers", "_token_expiry", "_refresh_task"):
+        monkeypatch.setattr(graph_utils, name, getattr(graph_utils, name))
+    graph_utils._set_token("old", 120)
+
+    async def fetch():
+        return graph_utils._set_token("new", 3600)
+
+    mock_fetch = AsyncMock(side_effect=fetch)
+    monkeypatch.setattr(graph_utils, "_fetch_token", mock_fetch)
+    assert await graph_utils._get_token() == "old"
+    await graph_utils._refresh_task
+
+    mock_fetch.assert_called_once()
+    assert await graph_utils._get_token() == "new"
+
+
+async def test_list_folder_children_follows_next_link(mock_graph):
+    """Every page of a folder listing should be returned."""
+
+    def handler(request):
+        if request.url.host != "next":
+            return httpx.Response(
+                status_code=200,
+                json={"value": [{"id": "a1"}], "@odata.nextLink": "https://next/page2"},
+            )
+        return httpx.Response(status_code=200, json={"value": [{"id": "a2"}]})
+
+    graph_utils.list_folder_children.cache_clear()
+    seen = mock_graph(handler)
+    children = await graph_utils.list_folder_children(
+        "d1", "f1", headers={"Authorization": "Bearer t"}
+    )
+
+    assert children == [{"id": "a1"}, {"id": "a2"}]
+    assert [str(r.url) for r in seen] == [
+        "https://graph.microsoft.com/v1.0/drives/d1/items/f1/children"
+        "?%24top=999&%24select=id%2Cname",
+        "https://next/page2",
+    ]
+
+
+async def test_get_item_name_is_cached(mock_graph):
+    """Repeated lookups of the same item should not hit Graph again."""
+
+    def handler(request):
+        return httpx.Response(status_code=200, json={"name": "slides.pptx"})
+
+    graph_utils.get_item_name.cache_clear()
+    seen = mock_graph(handler)
+    first = await graph_utils.get_item_name("d1", "i1")
+    second = await graph_utils.get_item_name("d1", "i1")
+
+    assert first == second == "slides.pptx"
+    assert len(seen) == 1
+
+
+async def test_get_item_name_cache_keys_keyword_arguments(mock_graph):
+    """Keyword calls for different items must not share a cache entry."""
+
+    def handler(request):
+        return httpx.Response(status_code=200, json={"name": request.url.path})
+
+    graph_utils.get_item_name.cache_clear()
+    seen = mock_graph(handler)
+    first = await graph_utils.get_item_name(drive_id="d1", item_id="i1")
+    second = await graph_utils.get_item_name(drive_id="d2", item_id="i2")
+    positional = await graph_utils.get_item_name("d1", "i1", headers={})
+
+    assert first == "/v1.0/drives/d1/items/i1"
+    assert second == "/v1.0/drives/d2/items/i2"
+    assert positional == first
+    assert len(seen) == 2
+
+
+async def test_graph_batch_returns_responses_in_request_order(mock_graph):
+    """Sub-responses should be matched to their requests by id."""
+
+    def handler(request):
+        # Sub-responses deliberately returned out of order
+        return httpx.Response(
+            status_code=200,
+            json={
+                "responses": [
+                    {"id": "1", "status": 200, "body": {"value": [{"id": "a1"}]}},
+                    {"id": "0", "status": 200, "body": {"name": "slides.pptx"}},
+                ]
+            },
+        )
+
+    seen = mock_graph(handler)
+    item, children = await graph_utils.graph_batch(
+        [
+            {"method": "GET", "url": "/drives/d1/items/i1"},
+            {"method": "GET", "url": "/drives/d1/items/f1/children"},
+        ]
+    )
+
+    assert item.json() == {"name": "slides.pptx"}
+    assert children.json() == {"value": [{"id": "a1"}]}
+    assert len(seen) == 1
+    assert str(seen[0].url) == "https://graph.microsoft.com/v1.0/$batch"
+    assert [r["url"] for r in json.loads(seen[0].content)["requests"]] == [
+        "/drives/d1/items/i1",
+        "/drives/d1/items/f1/children",
     ]
 
-    with patch.object(graph_utils, "graph_client", mock_client), patch(
-        "graph_utils._auth_headers",
-        new=AsyncMock(return_value={"Authorization": "Bearer t"}),
-    ):
-        result = await graph_utils.download_file_from_graph("d1", "i1")
-
-    assert result == b"final"
-    assert mock_client.get.await_args_list == [
-        (("https://graph.microsoft.com/v1.0/drives/d1/items/i1/content",), {
-            "headers": {"Authorization": "Bearer t"}
-        }),
-        (("https://r1",), {"headers": {"Authorization": "Bearer t"}}),
-        (("https://r2",), {"headers": {"Authorization": "Bearer t"}}),
+
+async def test_stream_file_retries_throttled_response(
+    tmp_path, mock_graph, monkeypatch
+):
+    """A 429 response should be retried after the Retry-After interval."""
+    handler = _replay(
+        [
+            httpx.Response(status_code=429, headers={"Retry-After": "3"}),
+            httpx.Response(status_code=200, content=b"data"),
+        ]
+    )
+    sleep = AsyncMock()
+    calls = mock_graph(handler)
+    monkeypatch.setattr(graph_utils.asyncio, "sleep", sleep)
+    dest = tmp_path / "out.bin"
+    await graph_utils.stream_file_from_graph("d1", "i1", dest)
+
+    assert dest.read_bytes() == b"data"
+    assert len(calls) == 2
+    sleep.assert_awaited_once()
+    assert sleep.await_args.args[0] == pytest.approx(3.1, abs=0.1)
+
+
+async def test_upload_streams_file_handle(tmp_path, mock_graph):
+    """File handles should be streamed with an explicit Content-Length."""
+
+    def handler(request):
+        return httpx.Response(status_code=201, json={"webUrl": "https://web/v.mp4"})
+
+    video = tmp_path / "v.mp4"
+    video.write_bytes(b"video" * 1000)
+    seen = mock_graph(handler)
+    with video.open("rb") as fh:
+        url = await graph_utils.upload_file_to_graph("d1", "f1", "v.mp4", fh)
+
+    assert url == "https://web/v.mp4"
+    assert seen[0].method == "PUT"
+    assert seen[0].headers["Content-Length"] == "5000"
+    assert seen[0].content == b"video" * 1000
+
+
+async def test_large_upload_uses_upload_session(tmp_path, monkeypatch, mock_graph):
+    """Files above the small-upload limit should be sent in ranged fragments."""
+    monkeypatch.setattr(graph_utils, "SMALL_UPLOAD_LIMIT", 5)
+    monkeypatch.setattr(graph_utils, "UPLOAD_SESSION_CHUNK_SIZE", 4)
+
+    def handler(request):
+        if request.method == "POST":
+            return httpx.Response(
+                status_code=200, json={"uploadUrl": "https://upload/session"}
+            )
+        return httpx.Response(status_code=201, json={"webUrl": "https://web/v.mp4"})
+
+    video = tmp_path / "v.mp4"
+    video.write_bytes(b"0123456789")
+    seen = mock_graph(handler)
+    with video.open("rb") as fh:
+        url = await graph_utils.upload_file_to_graph("d1", "f1", "v.mp4", fh)
+
+    assert url == "https://web/v.mp4"
+    assert str(seen[0].url) == (
+        "https://graph.microsoft.com/v1.0/drives/d1/items/f1:/v.mp4:/createUploadSession"
+    )
+    assert [(r.headers["Content-Range"], r.content) for r in seen[1:]] == [
+        ("bytes 0-3/10", b"0123"),
+        ("bytes 4-7/10", b"4567"),
+        ("bytes 8-9/10", b"89"),
+    ]
+    assert all("Authorization" not in r.headers for r in seen[1:])
+
+
+async def test_batch_download_follows_redirects_without_auth(tmp_path, mock_graph):
+    """Download URLs should be resolved in one batch and fetched without auth."""
+
+    def handler(request):
+        if request.url.path.endswith("/$batch"):
+            return httpx.Response(
+                status_code=200,
+                json={
+                    "responses": [
+                        {
+                            "id": str(idx),
+                            "status": 302,
+                            "headers": {"Location": f"https://cdn/{idx}"},
+                        }
+                        for idx in range(2)
+                    ]
+                },
+            )
+        return httpx.Response(status_code=200, content=request.url.path.encode())
+
+    seen = mock_graph(handler)
+    await graph_utils.batch_download_from_graph(
+        "d1", {"a1": tmp_path / "a1.mp3", "a2": tmp_path / "a2.mp3"}
+    )
+
+    assert (tmp_path / "a1.mp3").read_bytes() == b"/0"
+    assert (tmp_path / "a2.mp3").read_bytes() == b"/1"
+    assert len(seen) == 3
+    assert [r["url"] for r in json.loads(seen[0].content)["requests"]] == [
+        "/drives/d1/items/a1/content",
+        "/drives/d1/items/a2/content",
     ]
+    assert all("Authorization" not in r.headers for r in seen[1:])
+
+
+async def test_batch_download_failure_waits_for_other_downloads(tmp_path, mock_graph):
+    """A failed item should only be reported once the others have finished."""
+
+    async def handler(request):
+        if request.url.path.endswith("/$batch"):
+            return httpx.Response(
+                status_code=200,
+                json={
+                    "responses": [
+                        {"id": "0", "status": 404},
+                        {
+                            "id": "1",
+                            "status": 302,
+                            "headers": {"Location": "https://cdn/1"},
+                        },
+                    ]
+                },
+            )
+        if request.url.host == "cdn":
+            await asyncio.sleep(0.05)
+            return httpx.Response(status_code=200, content=b"audio")
+        return httpx.Response(status_code=404)
+
+    mock_graph(handler)
+    with pytest.raises(httpx.HTTPStatusError):
+        await graph_utils.batch_download_from_graph(
+            "d1", {"a1": tmp_path / "a1.mp3", "a2": tmp_path / "a2.mp3"}
+        )
+
+    assert (tmp_path / "a2.mp3").read_bytes() == b"audio"
+
+
+async def test_batch_download_fallback_uses_current_token(
+    tmp_path, mock_graph, monkeypatch
+):
+    """Fallback downloads should not reuse the token read for the batch."""
+
+    def handler(request):
+        if request.url.path.endswith("/$batch"):
+            return httpx.Response(
+                status_code=200, json={"responses": [{"id": "0", "status": 429}]}
+            )
+        return httpx.Response(status_code=200, content=b"audio")
+
+    seen = mock_graph(handler)
+    tokens = iter(["Bearer old", "Bearer new"])
+
+    async def rotating_auth():
+        return {"Authorization": next(tokens)}
+
+    monkeypatch.setattr(graph_utils, "_auth_headers", rotating_auth)
+    await graph_utils.batch_download_from_graph("d1", {"a1": tmp_path / "a1.mp3"})
+
+    assert [r.headers["Authorization"] for r in seen] == ["Bearer old", "Bearer new"]
+    assert (tmp_path / "a1.mp3").read_bytes() == b"audio"
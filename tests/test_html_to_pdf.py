@@ -1,46 +1,84 @@
-from unittest.mock import patch
+import os
+from concurrent.futures.process import BrokenProcessPool
 
-from fastapi.testclient import TestClient
+import pytest
 
 import extractor_api
 
-client = TestClient(extractor_api.app)
+HTML_BYTES = b"<h1>Hi</h1>"
+PDF_MAGIC = b"%PDF-1.7"
 
 
 class DummyHTML:
     def __init__(self, string):
         self.string = string
 
-    def write_pdf(self, target, stylesheets=None, presentational_hints=False):
-        target.write(b"%PDF-1.7")
+    def write_pdf(
+        self, target, stylesheets=None, presentational_hints=False, font_config=None
+    ):
+        target.write(PDF_MAGIC)
 
 
 class FailingHTML(DummyHTML):
-    def write_pdf(self, target, stylesheets=None, presentational_hints=False):
+    def write_pdf(
+        self, target, stylesheets=None, presentational_hints=False, font_config=None
+    ):
         raise RuntimeError("fail")
 
 
-def test_html_to_pdf_sync_success():
-    with patch("extractor_api.HTML", DummyHTML):
-        payload = b"<h1>Hi</h1>"
-        res = client.post("/html-to-pdf", data=payload)
-    assert res.status_code == 200
-    assert res.headers["content-type"] == "application/pdf"
-    assert res.content.startswith(b"%PDF")
+@pytest.fixture
+def html_stub(monkeypatch, request):
+    """Replace WeasyPrint's HTML class with ``request.param``."""
+    monkeypatch.setattr(extractor_api, "HTML", request.param)
+    # Render in the default thread pool so the stub is used
+    monkeypatch.setattr(extractor_api, "pdf_pool", None)
+
+
+# Both endpoints accept the same raw HTML body
+ENDPOINTS = pytest.mark.parametrize("path", ["/html-to-pdf", "/html-to-pdf/async"])
 
 
-def test_html_to_pdf_async_success():
-    with patch("extractor_api.HTML", DummyHTML):
-        payload = b"<h1>Hi</h1>"
-        res = client.post("/html-to-pdf/async", data=payload)
+@ENDPOINTS
+@pytest.mark.parametrize("html_stub", [DummyHTML], indirect=True)
+def test_html_to_pdf_success(client, html_stub, path):
+    res = client.post(path, content=HTML_BYTES)
     assert res.status_code == 200
     assert res.headers["content-type"] == "application/pdf"
-    assert res.content.startswith(b"%PDF")
+    assert res.content == PDF_MAGIC
 
 
-def test_html_to_pdf_failure():
-    with patch("extractor_api.HTML", FailingHTML):
-        payload = b"<h1>Hi</h1>"
-        res = client.post("/html-to-pdf/async", data=payload)
+@ENDPOINTS
+@pytest.mark.parametrize("html_stub", [FailingHTML], indirect=True)
+def test_html_to_pdf_failure(client, html_stub, path):
+    res = client.post(path, content=HTML_BYTES)
     assert res.status_code == 500
     assert res.json()["detail"] == "PDF generation failed"
+
+
+@pytest.fixture
+def spawn_pool(monkeypatch):
+    """Render async requests in a fresh single-worker spawn pool."""
+    monkeypatch.setattr(extractor_api, "PDF_WORKERS", 1)
+    monkeypatch.setattr(extractor_api, "pdf_pool", extractor_api._create_pdf_pool())
+    yield
+    extractor_api.pdf_pool.shutdown()
+
+
+@pytest.mark.integration
+def test_html_to_pdf_async_renders_in_process_pool(client, spawn_pool):
+    res = client.post("/html-to-pdf/async", content=HTML_BYTES)
+    assert res.status_code == 200
+    assert res.content.startswith(b"%PDF")
+
+
+@pytest.mark.integration
+def test_html_to_pdf_async_replaces_broken_pool(client, spawn_pool):
+    broken = extractor_api.pdf_pool
+    # Kill the only worker, as a crash or the OOM killer would
+    with pytest.raises(BrokenProcessPool):
+        broken.submit(os._exit, 1).result()
+
+    res = client.post("/html-to-pdf/async", content=HTML_BYTES)
+    assert res.status_code == 200
+    assert res.content.startswith(b"%PDF")
+    assert extractor_api.pdf_pool is not broken
@@ -1,21 +1,66 @@
+import asyncio
 import subprocess
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
 
 import pytest
 
 import extractor_api
 
 
-@pytest.mark.asyncio
-async def test_run_cmd_raises_with_output():
+def _fake_process(monkeypatch, returncode, stdout=b"", stderr=b""):
+    """Make ``create_subprocess_exec`` return a finished stub process."""
+    proc = SimpleNamespace(
+        returncode=returncode,
+        communicate=AsyncMock(return_value=(stdout, stderr)),
+        kill=Mock(),
+        wait=AsyncMock(return_value=returncode),
+    )
+    spawn = AsyncMock(return_value=proc)
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", spawn)
+    return spawn
+
+
+async def test_run_cmd_raises_with_output(monkeypatch):
+    _fake_process(monkeypatch, 1, stderr=b"err\n")
+    cmd = ["tool", "--fail"]
+    with pytest.raises(subprocess.CalledProcessError) as exc:
+        await extractor_api.run_cmd(cmd)
+
+    assert exc.value.returncode == 1
+    assert exc.value.cmd == cmd
+    assert exc.value.output == b""
+    assert exc.value.stderr == b"err\n"
+
+
+async def test_run_cmd_returns_stdout(monkeypatch):
+    spawn = _fake_process(monkeypatch, 0, stdout=b"1.5\n")
+    result = await extractor_api.run_cmd(["tool", "--print"])
+
+    assert result.stdout == "1.5\n"
+    assert spawn.await_args.args == ("tool", "--print")
+
+
+async def test_run_cmd_kills_process_when_cancelled(monkeypatch):
+    spawn = _fake_process(monkeypatch, None)
+    proc = spawn.return_value
+    proc.communicate.side_effect = asyncio.CancelledError
+    with pytest.raises(asyncio.CancelledError):
+        await extractor_api.run_cmd(["tool"])
+
+    proc.kill.assert_called_once_with()
+    proc.wait.assert_awaited_once()
+
+
+@pytest.mark.integration
+async def test_run_cmd_spawns_real_process():
     cmd = [
         "python",
         "-c",
-        "import sys; print('err', file=sys.stderr); sys.exit(1)",
+        "import sys; print('out'); print('err', file=sys.stderr); sys.exit(1)",
     ]
     with pytest.raises(subprocess.CalledProcessError) as exc:
         await extractor_api.run_cmd(cmd)
 
-    assert exc.value.returncode == 1
-    assert exc.value.cmd == cmd
-    assert exc.value.output == b""
+    assert exc.value.output == b"out\n"
     assert exc.value.stderr == b"err\n"